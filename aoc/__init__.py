@@ -0,0 +1,4 @@
+'''
+Shared tooling for the Advent of Code 2022 solutions: input loading, running and timing.
+The solutions themselves live in the dayXX folders.
+'''
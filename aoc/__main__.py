@@ -0,0 +1,81 @@
+'''
+Command line entry point: `python -m aoc --day 11 --part 2`.
+Without arguments all days and both parts are run.
+'''
+import argparse
+import json
+import sys
+
+from aoc import profiling
+from aoc.runner import DAY_MODULES, PARTS, format_results, results_to_dict, run_day, run_parallel
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m aoc',
+                                     description='Run and time the Advent of Code 2022 solutions.')
+    parser.add_argument('--day', '-d', type=int, nargs='+', choices=sorted(DAY_MODULES),
+                        default=sorted(DAY_MODULES), metavar='DAY',
+                        help='days to run (default: all)')
+    parser.add_argument('--part', '-p', type=int, nargs='+', choices=PARTS, default=list(PARTS),
+                        help='parts to run (default: both)')
+    parser.add_argument('--input', '-i', default=None,
+                        help="read the input from this file, or '-' for stdin (only with a single day)")
+    parser.add_argument('--input-dir', default=None,
+                        help='local directory containing the inputs (dayXX.txt)')
+    parser.add_argument('--mmap', dest='use_mmap', action='store_true',
+                        help='memory-map the input files rather than reading them')
+    parser.add_argument('--offline', action='store_true', default=None,
+                        help='never download inputs, only use the cache and local files')
+    parser.add_argument('--no-memory', dest='trace_memory', action='store_false',
+                        help='do not trace peak memory (tracing slows down the solutions)')
+    parser.add_argument('--parallel', action='store_true',
+                        help='run every part of every day at the same time in a process pool')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of processes used by --parallel (default: one per task, up to the CPU count)')
+    parser.add_argument('--timeout', type=float, default=None,
+                        help='with --parallel, stop the tasks that take longer than this (in seconds)')
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false',
+                        help='always run the solutions, without looking up or storing their answers')
+    parser.add_argument('--profile', default=None, metavar='FILE',
+                        help='count calls and time of the hot functions and write them to FILE, '
+                             'as JSON if it ends with .json, as collapsed stacks for flamegraphs otherwise')
+    parser.add_argument('--json', action='store_true',
+                        help='print the results as JSON rather than as a table')
+    args = parser.parse_args(argv)
+    if args.input is not None and len(args.day) > 1:
+        parser.error('--input can only be used when running a single day')
+    if args.parallel and args.input == '-':
+        parser.error('the input cannot be read from stdin with --parallel')
+    if args.timeout is not None and not args.parallel:
+        parser.error('--timeout can only be used with --parallel')
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.profile is not None:
+        # Must happen before the day modules are imported
+        profiling.enable()
+        # Stored answers would skip the functions we want to profile
+        args.use_cache = False
+    input_options = {'source': args.input, 'offline': args.offline, 'input_dir': args.input_dir,
+                     'use_mmap': args.use_mmap}
+    if args.parallel:
+        results = run_parallel(args.day, args.part, max_workers=args.workers, timeout=args.timeout,
+                               trace_memory=args.trace_memory, use_cache=args.use_cache, **input_options)
+    else:
+        results = [run_day(day, args.part, trace_memory=args.trace_memory, use_cache=args.use_cache,
+                           **input_options)
+                   for day in args.day]
+    if args.json:
+        print(json.dumps(results_to_dict(results), indent=2, default=str))
+    else:
+        print(format_results(results))
+    if args.profile is not None:
+        profiling.dump(args.profile)
+    failed = any(phase.error is not None for r in results for phase in r.phases)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
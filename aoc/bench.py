@@ -0,0 +1,111 @@
+'''
+Scaling benchmarks: run the solutions on synthetic inputs of growing size (see aoc.generators)
+and record time, memory and throughput against the size of the input.
+
+    python -m aoc.bench --day 8 12 --scale 1 10 100 --timeout 60 --output bench.json
+
+Every (day, scale) pair runs in its own process, so a slow solver can be stopped without
+affecting the others and the peak memory of a run is not influenced by the previous ones.
+'''
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from aoc.generators import GENERATORS, SCALES, generate
+from aoc.runner import PARTS, run_parallel
+
+
+def run_benchmark(days:Iterable[int], scales:Iterable[int]=SCALES, parts:Iterable[int]=PARTS,
+                  timeout:float|None=60, seed:int=0, trace_memory:bool=True,
+                  verbose:bool=False) -> List[Dict]:
+    '''
+    Return a record for each (day, scale, phase) with the size of the input, the resources used
+    and the throughput (bytes of input per second).
+    '''
+    records = []
+    with tempfile.TemporaryDirectory(prefix='aoc-bench-') as tmp_dir:
+        for day in days:
+            # Once a scale fails or times out, the bigger ones are not going to do better
+            skip_bigger = False
+            for scale in sorted(scales):
+                data = generate(day, scale, seed)
+                input_bytes, input_lines = len(data.encode()), data.count('\n') + 1
+                if skip_bigger:
+                    records.append({'day': day, 'scale': scale, 'input_bytes': input_bytes,
+                                    'input_lines': input_lines, 'phase': None,
+                                    'error': 'skipped: a smaller scale did not complete'})
+                    continue
+                path = Path(tmp_dir) / f'day{day:02d}_x{scale}.txt'
+                path.write_text(data)
+                results = run_parallel([day], parts, max_workers=1, timeout=timeout,
+                                       trace_memory=trace_memory, source=str(path))
+                for phase in results[0].phases:
+                    record = {'day': day, 'scale': scale, 'input_bytes': input_bytes,
+                              'input_lines': input_lines, 'phase': phase.phase, 'error': phase.error}
+                    if phase.measure is not None:
+                        m = phase.measure
+                        record.update({
+                            'wall_time': m.wall_time,
+                            'cpu_time': m.cpu_time,
+                            'peak_memory': m.peak_memory,
+                            'bytes_per_second': input_bytes / m.wall_time if m.wall_time > 0 else None,
+                        })
+                    records.append(record)
+                    if verbose:
+                        print(format_record(record), file=sys.stderr)
+                    skip_bigger = skip_bigger or phase.error is not None
+    return records
+
+
+def format_record(record:Dict) -> str:
+    prefix = f"day {record['day']:>2} x{record['scale']:<5} {str(record['phase']):<6}"
+    if record['error'] is not None:
+        return f"{prefix} {record['error']}"
+    peak = record['peak_memory']
+    return (f"{prefix} {record['wall_time']*1000:>10.2f} ms "
+            f"{record['bytes_per_second']/1e6 if record['bytes_per_second'] else 0:>8.2f} MB/s "
+            f"{'-' if peak is None else f'{peak/1024:.1f} KiB':>12}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m aoc.bench',
+                                     description='Benchmark the solutions on synthetic inputs of growing size.')
+    parser.add_argument('--day', '-d', type=int, nargs='+', choices=sorted(GENERATORS),
+                        default=sorted(GENERATORS), metavar='DAY', help='days to run (default: all)')
+    parser.add_argument('--scale', '-s', type=int, nargs='+', default=list(SCALES),
+                        help=f'input sizes, as multiples of the real input (default: {" ".join(map(str, SCALES))})')
+    parser.add_argument('--part', '-p', type=int, nargs='+', choices=PARTS, default=list(PARTS))
+    parser.add_argument('--timeout', type=float, default=60,
+                        help='stop a run after this many seconds (default: 60)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', dest='trace_memory', action='store_false',
+                        help='do not trace peak memory (tracing slows down the solutions)')
+    parser.add_argument('--output', '-o', default=None,
+                        help='write the results as JSON to this file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    records = run_benchmark(args.day, args.scale, args.part, timeout=args.timeout, seed=args.seed,
+                            trace_memory=args.trace_memory, verbose=True)
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'seed': args.seed,
+        'timeout': args.timeout,
+        'records': records,
+    }
+    if args.output is None:
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,264 @@
+'''
+Generators of synthetic puzzle inputs, used to check how the solutions scale.
+
+`generate(day, scale)` returns a valid input for `day` that is about `scale` times bigger than
+the real puzzle input (1, 10, 100 and 1000 are the sizes used by the benchmarks).
+The same (day, scale, seed) always gives the same input.
+'''
+import math
+import random
+import string
+from typing import Callable, Dict, List
+
+SCALES = (1, 10, 100, 1000)
+LETTERS = string.ascii_lowercase + string.ascii_uppercase
+
+
+def generate_day01(rng:random.Random, scale:int) -> str:
+    elves = []
+    for _ in range(250 * scale):
+        calories = [str(rng.randint(1000, 60000)) for _ in range(rng.randint(1, 15))]
+        elves.append('\n'.join(calories))
+    return '\n\n'.join(elves)
+
+
+def generate_day02(rng:random.Random, scale:int) -> str:
+    return '\n'.join(f'{rng.choice("ABC")} {rng.choice("XYZ")}' for _ in range(2500 * scale))
+
+
+def generate_day03(rng:random.Random, scale:int) -> str:
+    rucksacks = []
+    for _ in range(100 * scale):
+        # The badge is the only item shared by the whole group: every other item of a member
+        # comes from a pool of letters that the other members do not use
+        badge = rng.choice(LETTERS)
+        others = [c for c in LETTERS if c != badge]
+        rng.shuffle(others)
+        for member in range(3):
+            pool = others[member*17:(member+1)*17]
+            # The duplicate is the only item in both compartments
+            duplicate, left_pool, right_pool = pool[0], pool[1:9], pool[9:]
+            half_size = rng.randint(4, 16)
+            left = [duplicate, badge] + rng.choices(left_pool, k=half_size-2)
+            right = [duplicate] + rng.choices(right_pool, k=half_size-1)
+            rng.shuffle(left)
+            rng.shuffle(right)
+            rucksacks.append(''.join(left) + ''.join(right))
+    return '\n'.join(rucksacks)
+
+
+def generate_day04(rng:random.Random, scale:int) -> str:
+    lines = []
+    for _ in range(1000 * scale):
+        a, b = sorted((rng.randint(1, 99), rng.randint(1, 99)))
+        c, d = sorted((rng.randint(1, 99), rng.randint(1, 99)))
+        lines.append(f'{a}-{b},{c}-{d}')
+    return '\n'.join(lines)
+
+
+def generate_day05(rng:random.Random, scale:int, columns:int=9) -> str:
+    heights = [rng.randint(2, 8 * scale) for _ in range(columns)]
+    max_height = max(heights)
+    drawing = []
+    for y in range(max_height):
+        row = []
+        for height in heights:
+            row.append(f'[{rng.choice(string.ascii_uppercase)}]' if max_height - y <= height else '   ')
+        drawing.append(' '.join(row))
+    drawing.append(' '.join(f' {i+1} ' for i in range(columns)))
+    # Moves never empty a column, so that every column has a crate on top at the end
+    instructions = []
+    for _ in range(500 * scale):
+        from_col = rng.choice([i for i in range(columns) if heights[i] > 1])
+        to_col = rng.choice([i for i in range(columns) if i != from_col])
+        how_many = rng.randint(1, min(heights[from_col] - 1, 30))
+        heights[from_col] -= how_many
+        heights[to_col] += how_many
+        instructions.append(f'move {how_many} from {from_col+1} to {to_col+1}')
+    return '\n'.join(drawing + [''] + instructions)
+
+
+def generate_day06(rng:random.Random, scale:int) -> str:
+    # Only 3 different characters until the end, so that both markers are found at the very end
+    length = 4096 * scale
+    prefix = ''.join(rng.choices('abc', k=length - 14))
+    return prefix + 'defghijklmnopq'
+
+
+def generate_day07(rng:random.Random, scale:int) -> str:
+    directories = 200 * scale
+    files = 400 * scale
+    # Random tree: every directory is attached to one of the previous ones
+    children = {0: []}
+    for d in range(1, directories):
+        children[d] = []
+        children[rng.randrange(d)].append(d)
+    dir_files = {d: [] for d in range(directories)}
+    # Keep the occupied space between 40M and 70M, so that problem 2 has a solution
+    mean_size = max(1, 50000000 // files)
+    for f in range(files):
+        dir_files[rng.randrange(directories)].append((f'f{f}.{rng.choice(["txt", "dat", "log"])}',
+                                                     rng.randint(1, 2 * mean_size)))
+    lines = []
+    # The tree can be very deep, so the visit is iterative
+    stack = [(0, False)]
+    while stack:
+        d, leaving = stack.pop()
+        if leaving:
+            lines.append('$ cd ..')
+            continue
+        lines.append('$ cd /' if d == 0 else f'$ cd d{d}')
+        lines.append('$ ls')
+        for child in children[d]:
+            lines.append(f'dir d{child}')
+        for name, size in dir_files[d]:
+            lines.append(f'{size} {name}')
+        if d != 0:
+            stack.append((d, True))
+        for child in reversed(children[d]):
+            stack.append((child, False))
+    return '\n'.join(lines)
+
+
+def generate_day08(rng:random.Random, scale:int) -> str:
+    side = round(99 * math.sqrt(scale))
+    return '\n'.join(''.join(rng.choices(string.digits, k=side)) for _ in range(side))
+
+
+def generate_day09(rng:random.Random, scale:int) -> str:
+    return '\n'.join(f'{rng.choice("RLUD")} {rng.randint(1, 20)}' for _ in range(2000 * scale))
+
+
+def generate_day10(rng:random.Random, scale:int) -> str:
+    # Each frame of the screen is 240 cycles long
+    cycles = 240 * scale
+    lines = []
+    while cycles > 0:
+        if cycles >= 2 and rng.random() < 0.7:
+            lines.append(f'addx {rng.randint(-10, 10)}')
+            cycles -= 2
+        else:
+            lines.append('noop')
+            cycles -= 1
+    return '\n'.join(lines)
+
+
+def generate_day11(rng:random.Random, scale:int, monkeys:int=8) -> str:
+    primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37]
+    divisors = rng.sample(primes, monkeys)
+    blocks = []
+    for m in range(monkeys):
+        items = [str(rng.randint(50, 99)) for _ in range(rng.randint(1, 8) * scale)]
+        if m == 0:
+            operation = 'old * old'
+        else:
+            operation = f'old {rng.choice("+*")} {rng.randint(1, 9)}'
+        true_to, false_to = rng.sample([i for i in range(monkeys) if i != m], 2)
+        blocks.append(f'Monkey {m}:\n'
+                      f'  Starting items: {", ".join(items)}\n'
+                      f'  Operation: new = {operation}\n'
+                      f'  Test: divisible by {divisors[m]}\n'
+                      f'    If true: throw to monkey {true_to}\n'
+                      f'    If false: throw to monkey {false_to}')
+    return '\n\n'.join(blocks)
+
+
+def generate_day12(rng:random.Random, scale:int) -> str:
+    height = round(41 * math.sqrt(scale))
+    width = max(26, round(173 * math.sqrt(scale)))
+    mid = height // 2
+    rows = []
+    for y in range(height):
+        row = []
+        for x in range(width):
+            # The height grows by at most 1 from a column to the next one, so the row in the
+            # middle is always a valid path. Other rows have random dips.
+            base = min(25, x * 26 // width)
+            level = base if y == mid else max(0, base - rng.choice((0, 0, 1, 2)))
+            row.append(chr(ord('a') + level))
+        rows.append(row)
+    rows[mid][0] = 'S'
+    rows[mid][-1] = 'E'
+    return '\n'.join(''.join(row) for row in rows)
+
+
+def _random_packet(rng:random.Random, depth:int=0) -> List:
+    packet = []
+    for _ in range(rng.randint(0, 5)):
+        if depth < 4 and rng.random() < 0.3:
+            packet.append(_random_packet(rng, depth + 1))
+        else:
+            packet.append(rng.randint(0, 10))
+    return packet
+
+
+def generate_day13(rng:random.Random, scale:int) -> str:
+    # Only imported here, so that the other generators do not depend on the solutions
+    from day13.solutions import compare
+    pairs = []
+    for _ in range(150 * scale):
+        left, right = _random_packet(rng), _random_packet(rng)
+        # Pairs such as [1] and [[1]] are different, but neither is in the right order
+        while compare((left, right)) is None:
+            right = _random_packet(rng)
+        pairs.append(f'{left}\n{right}'.replace(' ', ''))
+    return '\n\n'.join(pairs)
+
+
+def generate_day14(rng:random.Random, scale:int) -> str:
+    # The cave cannot be much deeper than the real one, because the floor of problem 2 only
+    # extends by 200 on each side: bigger inputs have more rocks and a wider cave.
+    half_width = min(450, round(50 * math.sqrt(scale)))
+    max_y = 170
+    paths = []
+    for _ in range(150 * scale):
+        x, y = rng.randint(500 - half_width, 500 + half_width), rng.randint(10, max_y)
+        points = [f'{x},{y}']
+        for i in range(rng.randint(1, 4)):
+            if i % 2 == 0:
+                x = min(500 + half_width, max(500 - half_width, x + rng.randint(-8, 8)))
+            else:
+                y = min(max_y, max(10, y + rng.randint(-8, 8)))
+            points.append(f'{x},{y}')
+        paths.append(' -> '.join(points))
+    return '\n'.join(paths)
+
+
+def generate_day15(rng:random.Random, scale:int, size:int=4000000) -> str:
+    # Every sensor reports one of the two beacons next to the distress beacon (x +- 1), so no
+    # sensor reaches the distress beacon: the closer of the two is always 1 step nearer to the
+    # sensor than the distress beacon, as long as the sensor is not on its column.
+    # Four sensors on the diagonals, at distance `a` on both axes, have radius 2a - 1: together
+    # they cover the square of side 2a around the distress beacon, except the beacon itself.
+    # The other sensors are close to the distress beacon, so that they cover reasonably sized
+    # areas, and only add work for the solver.
+    x, y = rng.randint(size // 4, 3 * size // 4), rng.randint(size // 4, 3 * size // 4)
+    a = max(x, size - x, y, size - y)
+    sensors = [(x + a, y + a), (x + a, y - a), (x - a, y + a), (x - a, y - a)]
+    taken = set(sensors) | {(x - 1, y), (x, y), (x + 1, y)}
+    spread = max(size // 20, 2 * math.isqrt(30 * scale) + 2)
+    while len(sensors) < 30 * scale:
+        sensor = (x + rng.randint(-spread, spread), y + rng.randint(-spread, spread))
+        if sensor[0] != x and sensor not in taken:
+            taken.add(sensor)
+            sensors.append(sensor)
+    rng.shuffle(sensors)
+    lines = []
+    for sx, sy in sensors:
+        bx = x + 1 if sx > x else x - 1
+        lines.append(f'Sensor at x={sx}, y={sy}: closest beacon is at x={bx}, y={y}')
+    return '\n'.join(lines)
+
+
+GENERATORS: Dict[int, Callable[[random.Random, int], str]] = {
+    1: generate_day01, 2: generate_day02, 3: generate_day03, 4: generate_day04,
+    5: generate_day05, 6: generate_day06, 7: generate_day07, 8: generate_day08,
+    9: generate_day09, 10: generate_day10, 11: generate_day11, 12: generate_day12,
+    13: generate_day13, 14: generate_day14, 15: generate_day15,
+}
+
+
+def generate(day:int, scale:int=1, seed:int=0) -> str:
+    if day not in GENERATORS:
+        raise ValueError(f'There is no input generator for day {day}.')
+    return GENERATORS[day](random.Random(seed), scale)
@@ -0,0 +1,206 @@
+'''
+Input loading layer shared by all the days.
+
+Inputs are kept in a content-addressed on-disk cache: the text of each input is stored
+once under the sha256 of its content (`objects/`), and a small reference file for each
+(year, day) points to it (`refs/`). Only when an input is missing from the cache we go
+through aocd (which needs the AOC_SESSION cookie from the .env file).
+
+Inputs can be read all at once (`get_input`), streamed one line at a time
+(`iter_input_lines`) or in chunks of bytes (`iter_input_chunks`, for inputs made of a single
+very long line), from a file, from stdin or from a memory-mapped file.
+
+In offline mode aocd is never imported: inputs are read from the cache, from a local
+directory (AOC_INPUT_DIR, containing files such as day01.txt) or from stdin.
+
+Environment variables:
+- AOC_CACHE_DIR: location of the cache (default: ~/.cache/aoc2022)
+- AOC_INPUT_DIR: local directory containing the inputs
+- AOC_OFFLINE:   if set to 1, never contact the Advent of Code website
+'''
+import hashlib
+import mmap
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import IO, Iterator
+
+YEAR = 2022
+STDIN = '-'
+
+
+def is_offline() -> bool:
+    return os.environ.get('AOC_OFFLINE', '0').lower() in ('1', 'true', 'yes')
+
+
+def get_cache_dir() -> Path:
+    if 'AOC_CACHE_DIR' in os.environ:
+        return Path(os.environ['AOC_CACHE_DIR'])
+    cache_home = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return Path(cache_home) / f'aoc{YEAR}'
+
+
+def hash_input(data:str) -> str:
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _object_path(digest:str) -> Path:
+    # Split on the first two characters, git style, so that no directory gets too big
+    return get_cache_dir() / 'objects' / digest[:2] / digest[2:]
+
+
+def _ref_path(day:int, year:int) -> Path:
+    return get_cache_dir() / 'refs' / str(year) / f'day{day:02d}'
+
+
+def _atomic_write(path:Path, data:str):
+    # Write on a temporary file first, so that a concurrent reader never sees a half-written file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def cache_input(day:int, data:str, year:int=YEAR) -> str:
+    '''
+    Store `data` in the cache as the input of (year, day) and return its hash.
+    '''
+    digest = hash_input(data)
+    obj = _object_path(digest)
+    if not obj.exists():
+        _atomic_write(obj, data)
+    _atomic_write(_ref_path(day, year), digest)
+    return digest
+
+
+def get_cached_path(day:int, year:int=YEAR) -> Path|None:
+    '''
+    Return the path of the cached input of (year, day), or None if it is not cached.
+    '''
+    ref = _ref_path(day, year)
+    if not ref.exists():
+        return None
+    obj = _object_path(ref.read_text().strip())
+    return obj if obj.exists() else None
+
+
+def get_local_path(day:int, input_dir:str|None=None) -> Path|None:
+    '''
+    Look for the input of `day` in a local directory (dayXX.txt, XX.txt or X.txt).
+    '''
+    input_dir = input_dir or os.environ.get('AOC_INPUT_DIR')
+    if input_dir is None:
+        return None
+    for filename in (f'day{day:02d}.txt', f'{day:02d}.txt', f'{day}.txt'):
+        path = Path(input_dir) / filename
+        if path.exists():
+            return path
+    return None
+
+
+def fetch_input(day:int, year:int=YEAR) -> str:
+    '''
+    Download the input using aocd and put it in the cache.
+    '''
+    # Only import these when actually needed: they are slow to import and aocd reads the session
+    from aocd import get_data
+    from dotenv import load_dotenv
+    load_dotenv()
+    data = get_data(day=day, year=year)
+    cache_input(day, data, year)
+    return data
+
+
+def get_input_path(day:int, year:int=YEAR, offline:bool|None=None,
+                   input_dir:str|None=None) -> Path:
+    '''
+    Return the path of a file containing the input of (year, day), downloading it if
+    needed and allowed. Local directories have precedence over the cache.
+    '''
+    offline = is_offline() if offline is None else offline
+    path = get_local_path(day, input_dir) or get_cached_path(day, year)
+    if path is not None:
+        return path
+    if offline:
+        raise FileNotFoundError(f'Input for day {day} of {year} is not available offline. '
+                                f'Put it in AOC_INPUT_DIR or in the cache ({get_cache_dir()}).')
+    fetch_input(day, year)
+    return get_cached_path(day, year)
+
+
+def get_input(day:int, year:int=YEAR, source:str|None=None, offline:bool|None=None,
+              input_dir:str|None=None) -> str:
+    '''
+    Return the input of (year, day) as a string.
+    `source` can be a path to a file or '-' to read the input from stdin.
+    '''
+    if source == STDIN:
+        return sys.stdin.read()
+    if source is not None:
+        return Path(source).read_text()
+    return get_input_path(day, year, offline, input_dir).read_text()
+
+
+def iter_file_lines(f:IO) -> Iterator[str]:
+    for line in f:
+        yield line.rstrip('\r\n')
+
+
+def iter_mmap_lines(path:Path) -> Iterator[str]:
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be memory-mapped
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b''):
+                yield line.rstrip(b'\r\n').decode()
+
+
+def iter_input_lines(day:int, year:int=YEAR, source:str|None=None, offline:bool|None=None,
+                     input_dir:str|None=None, use_mmap:bool=False) -> Iterator[str]:
+    '''
+    Like `get_input`, but yield the input one line at a time (without the line terminators),
+    so that the whole input never needs to be in memory. With `use_mmap` files are
+    memory-mapped rather than read through a buffer.
+    '''
+    if source == STDIN:
+        yield from iter_file_lines(sys.stdin)
+        return
+    path = Path(source) if source is not None else get_input_path(day, year, offline, input_dir)
+    if use_mmap:
+        yield from iter_mmap_lines(path)
+    else:
+        with open(path) as f:
+            yield from iter_file_lines(f)
+
+
+def iter_file_chunks(f:IO, chunk_size:int) -> Iterator[bytes]:
+    yield from iter(lambda: f.read(chunk_size), b'')
+
+
+def iter_mmap_chunks(path:Path, chunk_size:int) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for start in range(0, len(mm), chunk_size):
+                yield mm[start:start+chunk_size]
+
+
+def iter_input_chunks(day:int, year:int=YEAR, source:str|None=None, offline:bool|None=None,
+                      input_dir:str|None=None, use_mmap:bool=False,
+                      chunk_size:int=1 << 16) -> Iterator[bytes]:
+    '''
+    Like `iter_input_lines`, but yield the raw bytes of the input in chunks of `chunk_size`.
+    '''
+    if source == STDIN:
+        yield from iter_file_chunks(sys.stdin.buffer, chunk_size)
+        return
+    path = Path(source) if source is not None else get_input_path(day, year, offline, input_dir)
+    if use_mmap:
+        yield from iter_mmap_chunks(path, chunk_size)
+    else:
+        with open(path, 'rb') as f:
+            yield from iter_file_chunks(f, chunk_size)
@@ -0,0 +1,111 @@
+'''
+Call counters and timers for the hot functions of the solutions.
+
+Functions are marked with the `hot_path` decorator. Profiling is enabled by setting the
+environment variable AOC_PROFILE=1 or with `python -m aoc --profile FILE`, and it must be
+enabled before the day modules are imported: when it is disabled, `hot_path` returns the
+function itself, so the inner loops run exactly as if they were not decorated.
+
+Results can be dumped as JSON or as collapsed stacks (one `caller;callee self_time` line per
+stack, in microseconds), which can be read by flamegraph.pl, speedscope and similar tools.
+If AOC_PROFILE_OUTPUT is set, results are dumped there when the process exits.
+'''
+import atexit
+import functools
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Callable, Dict
+
+ENABLED = os.environ.get('AOC_PROFILE', '0').lower() in ('1', 'true', 'yes')
+
+_calls = defaultdict(int)           # label -> number of calls
+_total_times = defaultdict(float)   # label -> time spent in the function, callees included
+_stack_times = defaultdict(float)   # 'outer;inner' -> time spent in inner only, when called by outer
+_stack = []                         # labels of the decorated functions currently running
+_child_times = []                   # time spent in decorated callees, for each element of _stack
+
+
+def enable():
+    '''
+    Enable profiling for the modules imported from now on (and for child processes).
+    '''
+    global ENABLED
+    ENABLED = True
+    os.environ['AOC_PROFILE'] = '1'
+
+
+def hot_path(func:Callable) -> Callable:
+    if not ENABLED:
+        return func
+    label = f'{func.__module__}:{func.__qualname__}'
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        _stack.append(label)
+        _child_times.append(0.0)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            _calls[label] += 1
+            _total_times[label] += elapsed
+            _stack_times[';'.join(_stack)] += elapsed - _child_times.pop()
+            _stack.pop()
+            if _child_times:
+                _child_times[-1] += elapsed
+    return wrapper
+
+
+def snapshot() -> Dict:
+    return {
+        'functions': {
+            label: {'calls': _calls[label], 'total_time': _total_times[label]}
+            for label in sorted(_calls, key=lambda l: -_total_times[l])
+        },
+        'stacks': dict(_stack_times),
+    }
+
+
+def merge(other:Dict):
+    '''
+    Add the results of another process (as returned by `snapshot`) to the ones of this process.
+    '''
+    for label, stats in other['functions'].items():
+        _calls[label] += stats['calls']
+        _total_times[label] += stats['total_time']
+    for stack, self_time in other['stacks'].items():
+        _stack_times[stack] += self_time
+
+
+def reset():
+    _calls.clear()
+    _total_times.clear()
+    _stack_times.clear()
+
+
+def dump_json(path:str):
+    with open(path, 'w') as f:
+        json.dump(snapshot(), f, indent=2)
+
+
+def dump_collapsed(path:str):
+    with open(path, 'w') as f:
+        for stack, self_time in sorted(_stack_times.items()):
+            f.write(f'{stack} {round(self_time * 1e6)}\n')
+
+
+def dump(path:str):
+    '''
+    Dump as JSON if the path ends with .json, as collapsed stacks otherwise.
+    '''
+    if path.endswith('.json'):
+        dump_json(path)
+    else:
+        dump_collapsed(path)
+
+
+if ENABLED and os.environ.get('AOC_PROFILE_OUTPUT'):
+    atexit.register(dump, os.environ['AOC_PROFILE_OUTPUT'])
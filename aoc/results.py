@@ -0,0 +1,89 @@
+'''
+Persistent store of the answers, so that running a solution again on the same input is immediate.
+
+Answers are keyed by (day, part, input hash, solver version), where the solver version is the
+hash of the source of the day module: editing a solution invalidates its answers.
+The store is a SQLite database in the cache directory (see aoc.inputs), holding at most
+AOC_RESULT_CACHE_SIZE answers (default 1000): when it is full, the least recently used
+answers are evicted.
+'''
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Tuple
+
+from aoc.inputs import get_cache_dir
+
+DEFAULT_MAX_ENTRIES = 1000
+
+
+def hash_file(path:Path, chunk_size:int=1 << 20) -> str:
+    # Read in chunks, so that big inputs are never entirely in memory
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _to_json(value:Any):
+    # Answers can be NumPy scalars
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f'Cannot store answers of type {type(value)}')
+
+
+class ResultCache():
+    def __init__(self, path:Path|None=None, max_entries:int|None=None) -> None:
+        self.path = path or get_cache_dir() / 'results.sqlite'
+        self.max_entries = max_entries or int(os.environ.get('AOC_RESULT_CACHE_SIZE', DEFAULT_MAX_ENTRIES))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Workers of the process pool can write at the same time, so wait for the lock
+        self.connection = sqlite3.connect(self.path, timeout=30)
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                '  day INTEGER, part INTEGER, input_hash TEXT, solver_version TEXT,'
+                '  answer TEXT, last_used REAL,'
+                '  PRIMARY KEY (day, part, input_hash, solver_version))')
+
+    def get(self, day:int, part:int, input_hash:str, solver_version:str) -> Tuple[bool, Any]:
+        '''
+        Return (True, answer) if the answer is stored, (False, None) otherwise.
+        '''
+        key = (day, part, input_hash, solver_version)
+        row = self.connection.execute(
+            'SELECT answer FROM results '
+            'WHERE day = ? AND part = ? AND input_hash = ? AND solver_version = ?', key).fetchone()
+        if row is None:
+            return False, None
+        with self.connection:
+            self.connection.execute(
+                'UPDATE results SET last_used = ? '
+                'WHERE day = ? AND part = ? AND input_hash = ? AND solver_version = ?',
+                (time.time(), *key))
+        return True, json.loads(row[0])
+
+    def put(self, day:int, part:int, input_hash:str, solver_version:str, answer:Any):
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                (day, part, input_hash, solver_version, json.dumps(answer, default=_to_json), time.time()))
+            # Evict the least recently used answers
+            self.connection.execute(
+                'DELETE FROM results WHERE rowid IN ('
+                '  SELECT rowid FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,))
+
+    def clear(self):
+        with self.connection:
+            self.connection.execute('DELETE FROM results')
+
+    def __len__(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,279 @@
+'''
+Run the solutions of any subset of days and parts, measuring each phase separately.
+
+Every day module exposes the same three functions:
+- parse(lines) builds the data structures from an iterator over the lines of the input
+- part1(parsed) and part2(parsed) compute the answers to the two problems
+Modules that set INPUT_CHUNKS = True get the raw bytes of the input in chunks instead of lines.
+
+Day modules are imported only when they are requested.
+'''
+import concurrent.futures
+import importlib
+import math
+import os
+import signal
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from aoc import profiling
+from aoc.inputs import STDIN, get_input_path, iter_input_chunks, iter_input_lines
+from aoc.results import ResultCache, hash_file
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# The first days use solution.py, the following ones solutions.py
+DAY_MODULES = {
+    day: f'day{day:02d}.solution' if day <= 4 else f'day{day:02d}.solutions'
+    for day in range(1, 16)
+}
+PARTS = (1, 2)
+
+
+@dataclass
+class Measure():
+    '''
+    Resources used by a single phase: wall time and CPU time in seconds, peak memory in bytes
+    (None when memory is not traced).
+    '''
+    wall_time: float
+    cpu_time: float
+    peak_memory: int|None = None
+
+
+@dataclass
+class PhaseResult():
+    day: int
+    phase: str                  # 'parse', 'part1' or 'part2'
+    measure: Measure|None = None
+    answer: Any = None
+    error: str|None = None
+    cached: bool = False        # the answer comes from aoc.results.ResultCache
+
+
+@dataclass
+class DayResult():
+    day: int
+    phases: List[PhaseResult] = field(default_factory=list)
+    profile: Dict|None = None     # aoc.profiling results, when computed in another process
+
+
+def load_day(day:int) -> ModuleType:
+    if day not in DAY_MODULES:
+        raise ValueError(f'There is no solution for day {day}.')
+    # The day folders are imported as packages from the root of the repository
+    if str(ROOT_DIR) not in sys.path:
+        sys.path.insert(0, str(ROOT_DIR))
+    return importlib.import_module(DAY_MODULES[day])
+
+
+def get_solver_version(day:int) -> str:
+    '''
+    Hash of the source of the day module, used to invalidate the stored answers.
+    '''
+    return hash_file(ROOT_DIR / (DAY_MODULES[day].replace('.', '/') + '.py'))
+
+
+def measure(func:Callable, *args, trace_memory:bool=True) -> Tuple[Any, Measure]:
+    '''
+    Call `func(*args)` and return its result together with the resources it used.
+    '''
+    if trace_memory:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        memory_before, _ = tracemalloc.get_traced_memory()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        result = func(*args)
+    finally:
+        wall_time = time.perf_counter() - wall_start
+        cpu_time = time.process_time() - cpu_start
+        peak_memory = None
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            peak_memory = peak - memory_before
+            if started_tracing:
+                tracemalloc.stop()
+    return result, Measure(wall_time, cpu_time, peak_memory)
+
+
+def run_day(day:int, parts:Iterable[int]=PARTS, lines:Iterable[str]|None=None,
+            trace_memory:bool=True, use_cache:bool=False, **input_options) -> DayResult:
+    '''
+    Parse the input of `day` once and run the requested parts on it.
+    `input_options` are passed to aoc.inputs.iter_input_lines (or iter_input_chunks, for modules
+    with INPUT_CHUNKS set) when `lines` are not given: the input is streamed, so reading it is
+    part of the parse phase.
+    With `use_cache`, answers are looked up in (and then saved to) the aoc.results store: when
+    all the requested parts are stored the day module is not even imported.
+    '''
+    day_result = DayResult(day)
+    parts = list(parts)
+    # Answers can only be stored when the input can be hashed without consuming it
+    cache = None
+    if use_cache and lines is None and input_options.get('source') != STDIN:
+        try:
+            source = input_options.get('source')
+            path = Path(source) if source is not None else \
+                   get_input_path(day, offline=input_options.get('offline'),
+                                  input_dir=input_options.get('input_dir'))
+            cache = ResultCache()
+            cache_key = (hash_file(path), get_solver_version(day))
+        except Exception as e:
+            day_result.phases.append(PhaseResult(day, 'parse', error=repr(e)))
+            return day_result
+        for part in list(parts):
+            found, answer = cache.get(day, part, *cache_key)
+            if found:
+                day_result.phases.append(PhaseResult(day, f'part{part}', answer=answer, cached=True))
+                parts.remove(part)
+        if not parts:
+            cache.close()
+            return day_result
+
+    try:
+        module = load_day(day)
+        if lines is None:
+            if getattr(module, 'INPUT_CHUNKS', False):
+                lines = iter_input_chunks(day, **input_options)
+            else:
+                lines = iter_input_lines(day, **input_options)
+        parsed, parse_measure = measure(module.parse, lines, trace_memory=trace_memory)
+    except Exception as e:
+        day_result.phases.append(PhaseResult(day, 'parse', error=repr(e)))
+        return day_result
+    day_result.phases.append(PhaseResult(day, 'parse', parse_measure))
+    for part in parts:
+        phase = f'part{part}'
+        try:
+            answer, part_measure = measure(getattr(module, phase), parsed, trace_memory=trace_memory)
+            day_result.phases.append(PhaseResult(day, phase, part_measure, answer))
+            if cache is not None:
+                cache.put(day, part, *cache_key, answer)
+        except Exception as e:
+            day_result.phases.append(PhaseResult(day, phase, error=repr(e)))
+    if cache is not None:
+        cache.close()
+    day_result.phases.sort(key=lambda p: (p.phase != 'parse', p.phase))
+    return day_result
+
+
+def _raise_timeout(signum, frame):
+    raise TimeoutError('the task took too long')
+
+
+def _run_task(day:int, part:int, timeout:float|None, trace_memory:bool, use_cache:bool,
+              input_options:Dict) -> DayResult:
+    '''
+    Run a single part of a day in a worker process, interrupting it after `timeout` seconds.
+    '''
+    if timeout is not None:
+        # Tasks run in the main thread of the worker, so an alarm interrupts the solver
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        result = run_day(day, (part,), trace_memory=trace_memory, use_cache=use_cache, **input_options)
+    finally:
+        if timeout is not None:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    if profiling.ENABLED:
+        # Workers are reused by other tasks: send back the counters of this task only
+        result.profile = profiling.snapshot()
+        profiling.reset()
+    return result
+
+
+def run_parallel(days:Iterable[int], parts:Iterable[int]=PARTS, max_workers:int|None=None,
+                 timeout:float|None=None, trace_memory:bool=True, use_cache:bool=False,
+                 **input_options) -> List[DayResult]:
+    '''
+    Run every (day, part) pair as a separate task of a process pool. Each task parses its own
+    input, so the run takes about as long as the slowest task.
+    Tasks still running after `timeout` seconds are reported with a TimeoutError.
+    '''
+    tasks = [(day, part) for day in days for part in parts]
+    max_workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+    futures = {
+        executor.submit(_run_task, day, part, timeout, trace_memory, use_cache, input_options): (day, part)
+        for day, part in tasks
+    }
+    # The alarm in the workers handles the timeouts, this is a safety net for the solvers
+    # that cannot be interrupted (eg. when they wait on their own threads)
+    deadline = None
+    if timeout is not None:
+        deadline = timeout * math.ceil(len(tasks) / max_workers) + 5
+    done, not_done = concurrent.futures.wait(futures, timeout=deadline)
+
+    results = {}
+    for future, (day, part) in futures.items():
+        day_result = results.setdefault(day, DayResult(day))
+        if future in not_done:
+            task_phases = [PhaseResult(day, f'part{part}', error=repr(TimeoutError('the task took too long')))]
+        elif future.exception() is not None:
+            task_phases = [PhaseResult(day, f'part{part}', error=repr(future.exception()))]
+        else:
+            task_phases = future.result().phases
+            if future.result().profile is not None:
+                profiling.merge(future.result().profile)
+        for phase in task_phases:
+            # Both tasks of a day parse the input: only keep the first parse
+            if phase.phase == 'parse' and any(p.phase == 'parse' for p in day_result.phases):
+                continue
+            day_result.phases.append(phase)
+
+    if not_done:
+        # There is no public API to stop a running task, so the workers are terminated
+        for process in list(executor._processes.values()):
+            process.terminate()
+    executor.shutdown(wait=not not_done, cancel_futures=True)
+    for day_result in results.values():
+        day_result.phases.sort(key=lambda p: (p.phase != 'parse', p.phase))
+    return [results[day] for day in sorted(results)]
+
+
+def format_bytes(size:int|None) -> str:
+    if size is None:
+        return '-'
+    for unit in ('B', 'KiB', 'MiB'):
+        if size < 1024:
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} GiB'
+
+
+def format_results(results:List[DayResult]) -> str:
+    '''
+    Print a table with a row for each phase of each day. Multi-line answers (eg. day 10) are
+    printed below their row.
+    '''
+    header = f"{'day':>3}  {'phase':<6} {'wall (ms)':>10} {'cpu (ms)':>10} {'peak mem':>10}  answer"
+    rows = [header, '-' * len(header)]
+    for day_result in results:
+        for phase in day_result.phases:
+            if phase.cached:
+                timings = f"{'cached':>10} {'-':>10} {'-':>10}"
+            elif phase.measure is not None:
+                m = phase.measure
+                timings = f'{m.wall_time*1000:>10.2f} {m.cpu_time*1000:>10.2f} {format_bytes(m.peak_memory):>10}'
+            else:
+                timings = f"{'-':>10} {'-':>10} {'-':>10}"
+            answer = phase.error if phase.error is not None else \
+                     ('' if phase.answer is None else str(phase.answer))
+            if '\n' in answer:
+                rows.append(f'{phase.day:>3}  {phase.phase:<6} {timings}')
+                rows.extend(f'     {line}' for line in answer.splitlines())
+            else:
+                rows.append(f'{phase.day:>3}  {phase.phase:<6} {timings}  {answer}')
+    return '\n'.join(rows)
+
+
+def results_to_dict(results:List[DayResult]) -> List[Dict]:
+    return [asdict(r) for r in results]
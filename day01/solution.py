@@ -1,35 +1,93 @@
+import heapq
 import os
+from typing import Dict, Iterable, List, Tuple
 
-from aocd import get_data
-from dotenv import load_dotenv
+import numpy as np
 
-if __name__ == '__main__':
-    # Read input file
-    load_dotenv()
-    lines = get_data(day=1, year=2022).splitlines()
-    # Iterate over lines
-    elf_calories = {}
-    elf_id = 0
+from aoc.inputs import iter_input_lines
+
+
+def parse(lines:Iterable[str], k:int=3) -> Dict[int, int]:
+    '''
+    Return the total calories of the `k` elves carrying the most.
+    Only the running sum of the current elf and a heap with the best `k` elves are kept,
+    so memory does not depend on the length of the input.
+    '''
+    # Min-heap of (calories, -elf_id): the first element is the one to discard.
+    # On ties the elf that comes first is preferred.
+    top_heap = []
+    elf_id, current_calories = 0, 0
+    def close_elf():
+        if len(top_heap) < k:
+            heapq.heappush(top_heap, (current_calories, -elf_id))
+        else:
+            heapq.heappushpop(top_heap, (current_calories, -elf_id))
     for line in lines:
         if line:
             # The line is a number of calories related to the current elf
-            if elf_id in elf_calories:
-                elf_calories[elf_id].append(int(line))
-            else:
-                # First time the elf id appears
-                elf_calories[elf_id] = [int(line)]          
+            current_calories += int(line)
         else:
             # The line was "\n", so we need to consider the following calories
             # as related to the following elf
+            close_elf()
             elf_id += 1
-    # Summing total calories
-    total_calories = {
-        elf_id: sum(elf_calories[elf_id])
-        for elf_id in elf_calories.keys()
-    }
-    # Getting top elf and top calories
-    top3_elves = sorted(total_calories, key=lambda e: -total_calories[e])[:3]
-    top3_calories = [total_calories[top_elf] for top_elf in top3_elves]
+            current_calories = 0
+    close_elf()
+    return {-neg_elf_id: calories for calories, neg_elf_id in top_heap}
+
+
+def parse_buffer(data:bytes, k:int=3) -> Dict[int, int]:
+    '''
+    Same as `parse`, but working on the whole input at once with NumPy: useful for very big
+    inputs that fit in memory (eg. a memory-mapped file).
+    '''
+    buf = np.frombuffer(data.rstrip(b'\r\n').replace(b'\r', b'') + b'\n', dtype=np.uint8)
+    is_newline = buf == ord('\n')
+    line_ends = np.flatnonzero(is_newline)
+    line_starts = np.concatenate(([0], line_ends[:-1] + 1))
+    # Value of each digit: it is multiplied by 10 ** (number of digits after it in the line)
+    line_of_char = np.cumsum(is_newline) - is_newline
+    digits_after = line_ends[line_of_char] - np.arange(len(buf)) - 1
+    digits = np.where(is_newline, 0, buf.astype(np.int64) - ord('0'))
+    char_values = digits * (10 ** np.maximum(digits_after, 0))
+    # Every line contains at least its newline, so no segment is empty
+    line_values = np.add.reduceat(char_values, line_starts)
+    # Empty lines separate the elves (and count as 0 calories)
+    elf_starts = np.concatenate(([0], np.flatnonzero(line_starts == line_ends) + 1))
+    total_calories = np.add.reduceat(line_values, elf_starts)
+    if len(total_calories) > k:
+        # Like parse, elves tied at the k-th place are taken in order of appearance
+        kth_calories = np.partition(total_calories, len(total_calories)-k)[len(total_calories)-k]
+        above = np.flatnonzero(total_calories > kth_calories)
+        tied = np.flatnonzero(total_calories == kth_calories)[:k-len(above)]
+        top_elves = np.concatenate((above, tied))
+    else:
+        top_elves = np.arange(len(total_calories))
+    return {int(elf_id): int(total_calories[elf_id]) for elf_id in top_elves}
+
+
+def get_top_elves(total_calories:Dict[int, int], k:int=3) -> Tuple[List[int], List[int]]:
+    # Getting top elves and top calories
+    top_elves = sorted(total_calories, key=lambda e: (-total_calories[e], e))[:k]
+    top_calories = [total_calories[top_elf] for top_elf in top_elves]
+    return top_elves, top_calories
+
+
+def part1(total_calories:Dict[int, int]) -> int:
+    _, top_calories = get_top_elves(total_calories, k=1)
+    return top_calories[0]
+
+
+def part2(total_calories:Dict[int, int]) -> int:
+    _, top_calories = get_top_elves(total_calories, k=3)
+    return sum(top_calories)
+
+
+if __name__ == '__main__':
+    # Read input file
+    lines = iter_input_lines(day=1)
+    total_calories = parse(lines)
+    top3_elves, top3_calories = get_top_elves(total_calories, k=3)
     # Solution to problem #1
     print(f"Top elf: {top3_elves[0]}, top calories: {top3_calories[0]}")
     # Solution to problem #2
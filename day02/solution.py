@@ -1,9 +1,11 @@
 import os
+from collections import Counter
 from enum import Enum
-from typing import List, Tuple
+from typing import Iterable, List, Tuple
 
-from aocd import get_data
-from dotenv import load_dotenv
+import numpy as np
+
+from aoc.inputs import iter_input_lines
 
 class Results(Enum):
     WIN  = 6
@@ -68,12 +70,58 @@ def get_total_points(ruleset:List):
     choices_points = [get_points_for_choice(line[1]) for line in ruleset]
     return sum(results_points) + sum(choices_points)
 
+def get_round_points(round:Tuple[RPS, RPS]) -> int:
+    return get_points_for_result(get_winner(round[1], round[0])) + get_points_for_choice(round[1])
+
+def build_points_table() -> np.ndarray:
+    # There are only 9 possible rounds: compute the points of each of them once, for both
+    # rulesets. table[ruleset, opponent, response], with 0 = A/X, 1 = B/Y, 2 = C/Z.
+    table = np.zeros((2, 3, 3), dtype=np.int64)
+    for i, opponent in enumerate('ABC'):
+        for j, response in enumerate('XYZ'):
+            table[0, i, j] = get_round_points(tuple(map(map_elements_to_rps, (opponent, response))))
+            table[1, i, j] = get_round_points(map_prob2_tuples_to_rps((opponent, response)))
+    return table
+
+POINTS_TABLE = build_points_table()
+ROUNDS = [f'{opponent} {response}' for opponent in 'ABC' for response in 'XYZ']
+
+def points_from_counts(round_counts:np.ndarray) -> Tuple[int, int]:
+    # round_counts[i] is the number of rounds equal to ROUNDS[i]
+    points_prob1, points_prob2 = POINTS_TABLE.reshape(2, 9) @ round_counts
+    return int(points_prob1), int(points_prob2)
+
+def parse(lines:Iterable[str]) -> Tuple[int, int]:
+    # Both rulesets are scored from how many times each of the 9 rounds is played,
+    # so rounds never need to be stored
+    line_counts = Counter(lines)
+    line_counts.pop('', None)
+    unknown = set(line_counts).difference(ROUNDS)
+    if unknown:
+        raise ValueError(f'Unknown rounds: {unknown}')
+    return points_from_counts(np.array([line_counts[r] for r in ROUNDS], dtype=np.int64))
+
+def parse_buffer(data:bytes) -> Tuple[int, int]:
+    '''
+    Same as `parse`, but working on the whole input at once with NumPy.
+    Every round is 4 bytes long ("A X\\n"), so the choices are at fixed offsets.
+    '''
+    buf = np.frombuffer(data.replace(b'\r', b'').rstrip(b'\n') + b'\n', dtype=np.uint8)
+    if len(buf) % 4 != 0:
+        raise ValueError('Every line should contain one round, as in "A X".')
+    opponents = buf[0::4].astype(np.int64) - ord('A')
+    responses = buf[2::4].astype(np.int64) - ord('X')
+    return points_from_counts(np.bincount(opponents * 3 + responses, minlength=9))
+
+def part1(points:Tuple[int, int]) -> int:
+    return points[0]
+
+def part2(points:Tuple[int, int]) -> int:
+    return points[1]
+
 if __name__ == '__main__':
-    load_dotenv()
-    lines = get_data(day=2, year=2022).splitlines()
+    points = parse(iter_input_lines(day=2))
     # Problem #1
-    prob1_ruleset = [list(map(map_elements_to_rps, line.split(' '))) for line in lines]
-    print(f"Total points if we consider rules as in problem 1: {get_total_points(prob1_ruleset)}")
+    print(f"Total points if we consider rules as in problem 1: {part1(points)}")
     # Problem #2
-    prob2_ruleset = list(map(map_prob2_tuples_to_rps, [line.split(' ') for line in lines]))
-    print(f"Total points if we consider rules as in problem 1: {get_total_points(prob2_ruleset)}")
+    print(f"Total points if we consider rules as in problem 1: {part2(points)}")
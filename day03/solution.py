@@ -1,8 +1,10 @@
+from itertools import islice
 from math import floor
-from typing import Tuple, Set
+from typing import Iterable, Tuple, Set
 
-from aocd import get_data
-from dotenv import load_dotenv
+import numpy as np
+
+from aoc.inputs import iter_input_lines
 
 def get_duplicates(*sets) -> Set:
     inter_set = set(sets[0])
@@ -24,28 +26,58 @@ def get_character_score(char:str) -> int:
     baseline = 96 if char.islower() else (65-27)
     return unicode_val - baseline
 
-def groups_iterator(lines, group_size=3):
-    it = range(0, len(lines), group_size)
-    for i in it:
-        yield lines[i:i+group_size]
+def parse(lines:Iterable[str], group_size:int=3, batch_groups:int=1024) -> Tuple[int, int]:
+    # Both scores are computed while reading: lines are collected in batches of whole groups,
+    # and the masks of each batch are computed together by `parse_buffer`.
+    duplicates_score, badges_score = 0, 0
+    it = iter(lines)
+    while batch := list(islice(it, group_size * batch_groups)):
+        batch_scores = parse_buffer('\n'.join(batch).encode(), group_size)
+        duplicates_score += batch_scores[0]
+        badges_score += batch_scores[1]
+    return duplicates_score, badges_score
+
+def get_masks_scores(masks:np.ndarray) -> np.ndarray:
+    if (masks == 0).any():
+        raise ValueError('There is no common item.')
+    # The lowest bits are powers of two below 2**52, so their log2 is exact
+    lowest_bits = masks & (~masks + np.uint64(1))
+    return np.log2(lowest_bits.astype(np.float64)).astype(np.int64) + 1
+
+def parse_buffer(data:bytes, group_size:int=3) -> Tuple[int, int]:
+    '''
+    Same as `parse`, but computing the masks of all the rucksacks at once with NumPy.
+    '''
+    buf = np.frombuffer(data.replace(b'\r', b'').rstrip(b'\n') + b'\n', dtype=np.uint8)
+    is_newline = buf == ord('\n')
+    line_ends = np.flatnonzero(is_newline)
+    line_starts = np.concatenate(([0], line_ends[:-1] + 1))
+    if len(line_ends) % group_size != 0:
+        raise ValueError(f'The number of rucksacks is not a multiple of {group_size}.')
+    # Bit of every item, newlines are empty masks
+    item_indices = np.where(buf >= ord('a'), buf.astype(np.int64) - ord('a'), buf.astype(np.int64) - ord('A') + 26)
+    item_bits = np.left_shift(np.uint64(1), np.clip(item_indices, 0, 51).astype(np.uint64))
+    item_bits[is_newline] = 0
+    # OR over the compartments: [start, middle) and [middle, next start)
+    compartment_starts = np.empty(2 * len(line_starts), dtype=np.int64)
+    compartment_starts[0::2] = line_starts
+    compartment_starts[1::2] = line_starts + (line_ends - line_starts) // 2
+    compartments = np.bitwise_or.reduceat(item_bits, compartment_starts)
+    left, right = compartments[0::2], compartments[1::2]
+    duplicates_score = get_masks_scores(left & right).sum()
+    group_masks = np.bitwise_and.reduce((left | right).reshape(-1, group_size), axis=1)
+    badges_score = get_masks_scores(group_masks).sum()
+    return int(duplicates_score), int(badges_score)
+
+def part1(scores:Tuple[int, int]) -> int:
+    return scores[0]
+
+def part2(scores:Tuple[int, int]) -> int:
+    return scores[1]
 
 if __name__ == '__main__':
-    load_dotenv()
-    lines = get_data(day=3, year=2022).splitlines()
+    scores = parse(iter_input_lines(day=3))
     # Problem #1
-    scores = [
-        get_character_score(
-            get_duplicates(*
-                split_rucksack_compartments(line)
-            ).pop()
-        ) for line in lines
-    ]
-    print(f"Score of duplicate elements: {sum(scores)}")
+    print(f"Score of duplicate elements: {part1(scores)}")
     # Problem #2
-    scores = [
-        get_character_score(
-            get_duplicates(*group).pop()
-        )
-        for group in groups_iterator(lines)
-    ]
-    print(f"Score of group keys: {sum(scores)}")
+    print(f"Score of group keys: {part2(scores)}")
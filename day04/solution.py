@@ -1,34 +1,188 @@
-from typing import Set, Tuple
+from itertools import chain
+from typing import Iterable, Iterator, Tuple
 
-from aocd import get_data
-from dotenv import load_dotenv
+import numpy as np
+
+from aoc.inputs import iter_input_lines
+
+# An assignment is the interval of section IDs [first, last], extremes included
+Interval = Tuple[int, int]
 
 def get_tuple_of_assignments(pair_assignment:str) -> str:
     return pair_assignment.split(',')
 
-def get_set_of_ids(assignment:str) -> Set:
-    id_range_limits = [int(x) for x in assignment.split('-')]
-    id_set = set(range(id_range_limits[0], id_range_limits[1]+1))
-    return id_set
+def get_interval(assignment:str) -> Interval:
+    first, last = assignment.split('-')
+    return int(first), int(last)
 
-def get_sets_of_assignments(pair_assignment:str) -> Tuple[Set, Set]:
+def get_intervals_of_assignments(pair_assignment:str) -> Tuple[Interval, Interval]:
     assignments = get_tuple_of_assignments(pair_assignment)
-    return get_set_of_ids(assignments[0]),  get_set_of_ids(assignments[1])
+    return get_interval(assignments[0]), get_interval(assignments[1])
+
+def iter_assignments(lines:Iterable[str]) -> Iterator[Tuple[Interval, Interval]]:
+    # Each line is parsed only once
+    for pair_assignment in lines:
+        if pair_assignment:
+            yield get_intervals_of_assignments(pair_assignment)
+
+def is_one_subset_of_other(interval_A:Interval, interval_B:Interval) -> bool:
+    (first_A, last_A), (first_B, last_B) = interval_A, interval_B
+    return (first_B <= first_A and last_A <= last_B) or (first_A <= first_B and last_B <= last_A)
+
+def are_overlapping(interval_A:Interval, interval_B:Interval) -> bool:
+    (first_A, last_A), (first_B, last_B) = interval_A, interval_B
+    return first_A <= last_B and first_B <= last_A
 
 def check_if_one_is_subset_of_other(pair_assignment:str) -> bool:
-    id_set_A, id_set_B = get_sets_of_assignments(pair_assignment)
-    return id_set_A.issubset(id_set_B) or id_set_B.issubset(id_set_A)
+    return is_one_subset_of_other(*get_intervals_of_assignments(pair_assignment))
 
 def check_for_overlaps(pair_assignment:str) -> bool:
-    id_set_A, id_set_B = get_sets_of_assignments(pair_assignment)
-    return len(id_set_A.intersection(id_set_B)) > 0
+    return are_overlapping(*get_intervals_of_assignments(pair_assignment))
+
+def parse(lines:Iterable[str]) -> Tuple[int, int]:
+    # Both counts are computed while reading, so that lines never need to be stored
+    full_overlaps, partial_overlaps = 0, 0
+    for interval_A, interval_B in iter_assignments(lines):
+        full_overlaps += is_one_subset_of_other(interval_A, interval_B)
+        partial_overlaps += are_overlapping(interval_A, interval_B)
+    return full_overlaps, partial_overlaps
+
+def load_endpoints(data:bytes) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Parse the whole input at once into four arrays: first and last section of A and of B.
+    '''
+    numbers = np.fromstring(data.translate(bytes.maketrans(b'-,\r\n', b'    ')), dtype=np.int64, sep=' ')
+    if len(numbers) % 4 != 0:
+        raise ValueError('Every line should contain two assignments, as in "2-4,6-8".')
+    endpoints = numbers.reshape(-1, 4)
+    return endpoints[:, 0], endpoints[:, 1], endpoints[:, 2], endpoints[:, 3]
+
+def parse_buffer(data:bytes) -> Tuple[int, int]:
+    '''
+    Same as `parse`, but with both answers computed by vectorized comparisons over all the pairs.
+    '''
+    first_A, last_A, first_B, last_B = load_endpoints(data)
+    full_overlaps = ((first_B <= first_A) & (last_A <= last_B)) | ((first_A <= first_B) & (last_B <= last_A))
+    partial_overlaps = (first_A <= last_B) & (first_B <= last_A)
+    return int(full_overlaps.sum()), int(partial_overlaps.sum())
+
+class IntervalIndex():
+    '''
+    Centered interval tree over the assignments of many pairs, answering which assignments
+    (or pairs) contain a section or overlap a range of sections.
+    Assignment `i` is the first (i even) or the second (i odd) of pair `i // 2`.
+
+    Every node has a center: assignments entirely on its left or on its right go down to the
+    children, the ones containing the center stay in the node, sorted both by first and by last
+    section. A query goes down from the root: when the range is on one side of a node's center
+    only that child is visited, when it contains the center both children are, but then all the
+    assignments of the node match. Centers are the medians of the first sections, so the tree is
+    balanced and every node holds at least one assignment: a query costs O(log n + output). At every
+    node the matching assignments are a slice of a sorted array.
+    '''
+    def __init__(self, firsts:np.ndarray, lasts:np.ndarray) -> None:
+        self.firsts = np.asarray(firsts, dtype=np.int64)
+        self.lasts = np.asarray(lasts, dtype=np.int64)
+        # For counting queries
+        self.sorted_firsts = np.sort(self.firsts)
+        self.sorted_lasts = np.sort(self.lasts)
+        # Nodes: center, left child, right child, ids by first, firsts, ids by last, lasts
+        self.nodes = []
+        self.root = self._build(np.arange(len(self.firsts)))
+
+    @classmethod
+    def from_endpoints(cls, first_A:np.ndarray, last_A:np.ndarray,
+                            first_B:np.ndarray, last_B:np.ndarray) -> 'IntervalIndex':
+        return cls(np.column_stack((first_A, first_B)).ravel(), np.column_stack((last_A, last_B)).ravel())
+
+    @classmethod
+    def from_assignments(cls, assignments:Iterable[Tuple[Interval, Interval]]) -> 'IntervalIndex':
+        '''
+        Bulk load the pairs given by `iter_assignments`, without building intermediate lists.
+        '''
+        endpoints = np.fromiter(chain.from_iterable(chain.from_iterable(assignments)), dtype=np.int64)
+        return cls.from_endpoints(*endpoints.reshape(-1, 4).T)
+
+    @classmethod
+    def from_lines(cls, lines:Iterable[str]) -> 'IntervalIndex':
+        return cls.from_assignments(iter_assignments(lines))
+
+    def _build(self, ids:np.ndarray) -> int:
+        if len(ids) == 0:
+            return -1
+        firsts, lasts = self.firsts[ids], self.lasts[ids]
+        # The median first section: the assignment starting there stays in this node, and at most
+        # half of the assignments start before it or after it, so the tree is balanced
+        center = int(np.partition(firsts, len(firsts) // 2)[len(firsts) // 2])
+        on_left, on_right = lasts < center, firsts > center
+        here = ids[~(on_left | on_right)]
+        by_first = here[np.argsort(self.firsts[here], kind='stable')]
+        by_last = here[np.argsort(self.lasts[here], kind='stable')]
+        node_id = len(self.nodes)
+        self.nodes.append(None)
+        left = self._build(ids[on_left])
+        right = self._build(ids[on_right])
+        self.nodes[node_id] = (center, left, right, by_first, self.firsts[by_first],
+                               by_last, self.lasts[by_last])
+        return node_id
+
+    def overlapping(self, first:int, last:int) -> np.ndarray:
+        '''
+        IDs of the assignments sharing at least a section with [first, last].
+        '''
+        found = []
+        to_visit = [self.root]
+        while to_visit:
+            node = to_visit.pop()
+            if node == -1:
+                continue
+            center, left, right, by_first, firsts, by_last, lasts = self.nodes[node]
+            if last < center:
+                # Assignments here end after the range, they only need to start before its end
+                found.append(by_first[:np.searchsorted(firsts, last, side='right')])
+                to_visit.append(left)
+            elif first > center:
+                # Assignments here start before the range, they only need to end after its start
+                found.append(by_last[np.searchsorted(lasts, first, side='left'):])
+                to_visit.append(right)
+            else:
+                # The range contains the center, as all the assignments here
+                found.append(by_first)
+                to_visit.extend((left, right))
+        return np.sort(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+    def covering(self, section:int) -> np.ndarray:
+        '''
+        IDs of the assignments containing `section`.
+        '''
+        return self.overlapping(section, section)
+
+    def pairs_covering(self, section:int) -> np.ndarray:
+        '''
+        Indices of the pairs where at least one of the two elves is assigned to `section`.
+        '''
+        return np.unique(self.covering(section) // 2)
+
+    def count_overlapping(self, first:int, last:int) -> int:
+        # Assignments starting before the end of the range, minus those ending before its start
+        return int(np.searchsorted(self.sorted_firsts, last, side='right') -
+                   np.searchsorted(self.sorted_lasts, first, side='left'))
+
+    def count_covering(self, section:int) -> int:
+        return self.count_overlapping(section, section)
+
+    def __len__(self) -> int:
+        return len(self.firsts)
+
+def part1(overlaps:Tuple[int, int]) -> int:
+    return overlaps[0]
+
+def part2(overlaps:Tuple[int, int]) -> int:
+    return overlaps[1]
 
 if __name__ == '__main__':
-    load_dotenv()
-    lines = get_data(day=4, year=2022).splitlines()
+    overlaps = parse(iter_input_lines(day=4))
     # Problem #1
-    is_pair_full_overlap = [int(check_if_one_is_subset_of_other(pair_ass)) for pair_ass in lines]
-    print(f"Pairs where there is a total overlap are {sum(is_pair_full_overlap)}.")
+    print(f"Pairs where there is a total overlap are {part1(overlaps)}.")
     # Problem #2
-    is_pair_partial_overlap = [int(check_for_overlaps(pair_ass)) for pair_ass in lines]
-    print(f"Pairs where there is a partial or total overlap are {sum(is_pair_partial_overlap)}")
+    print(f"Pairs where there is a partial or total overlap are {part2(overlaps)}")
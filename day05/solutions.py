@@ -1,14 +1,18 @@
 import re
-from collections import deque
+from array import array
+from itertools import chain
 from math import ceil
-from typing import Deque, List, Tuple
+from typing import Iterable, List, Tuple
 
-from aocd import get_data
-from dotenv import load_dotenv
+from aoc.inputs import iter_input_lines
+
+instruction_regex = re.compile(r'move (\d+) from (\d+) to (\d+)')
 
 
 class CratesProblem():
-    def __init__(self, lists:List[Deque[str]]) -> None:
+    def __init__(self, lists:List[List[str]]) -> None:
+        # Each column is a list of crates from the bottom to the top, so that moving crates
+        # from the top is just slicing and extending the lists
         self.columns = lists
 
     def move(self, from_col, to_col, how_many, model='CrateMover 9000'):
@@ -16,30 +20,94 @@ class CratesProblem():
         Move `how_many` boxes from `from_col` to `to_col`, using the rules of
         a specific model of crane.
         '''
-        from_col = from_col - 1
-        to_col = to_col - 1
+        from_column = self.columns[from_col - 1]
+        to_column = self.columns[to_col - 1]
+        if how_many > len(from_column):
+            raise ValueError(f'Cannot move {how_many} crates from column {from_col}, '
+                             f'which only has {len(from_column)}.')
+        if model not in ('CrateMover 9000', 'CrateMover 9001'):
+            raise NotImplementedError('Implemented crane models are CrateMover 9000 and 9001.')
+        if from_col == to_col:
+            # Crates are put back where they were taken from, with both models
+            return
+        split_point = len(from_column) - how_many
         if model == 'CrateMover 9000':
-            # Add and remove at the same time
-            for _ in range(how_many):
-                self.columns[to_col].appendleft(
-                    self.columns[from_col].popleft())
+            # Crates are moved one at a time, so they end up in reverse order
+            to_column.extend(reversed(from_column[split_point:]))
         elif model == 'CrateMover 9001':
-            # First add to new column
-            for i in range(how_many):
-                self.columns[to_col].appendleft(
-                    self.columns[from_col][how_many-1-i]
-                )
-            # Then remove from the old column
-            for _ in range(how_many):
-                self.columns[from_col].popleft()
-        else:
+            # Crates are moved all together, keeping their order
+            to_column.extend(from_column[split_point:])
+        del from_column[split_point:]
+
+    def run(self, instructions:array, model='CrateMover 9000'):
+        '''
+        Execute the instructions compiled by `compile_instructions`.
+        '''
+        it = iter(instructions)
+        for how_many, from_col, to_col in zip(it, it, it):
+            self.move(from_col, to_col, how_many, model=model)
+
+    def trace_last_crates(self, instructions:array, model='CrateMover 9000') -> str:
+        '''
+        Obtain the letters of the boxes on top after executing the instructions, without moving
+        any box: the top position of each column is followed backwards through the instructions
+        to the box that was there at the start. Columns that end up empty are skipped.
+        '''
+        if model not in ('CrateMover 9000', 'CrateMover 9001'):
             raise NotImplementedError('Implemented crane models are CrateMover 9000 and 9001.')
+        reverse_order = model == 'CrateMover 9000'
+        # Only the heights of the columns are needed going forward, to know which columns are not empty
+        heights = [len(col) for col in self.columns]
+        it = iter(instructions)
+        for how_many, from_col, to_col in zip(it, it, it):
+            if how_many > heights[from_col - 1]:
+                raise ValueError(f'Cannot move {how_many} crates from column {from_col}, '
+                                 f'which only has {heights[from_col - 1]}.')
+            heights[from_col - 1] -= how_many
+            heights[to_col - 1] += how_many
+        # Each traced position is a depth (0 is the top) in a column. Positions are grouped by
+        # column, so that an instruction only looks at the positions in the columns it touches.
+        traced = [col for col in range(len(heights)) if heights[col] > 0]
+        depths = [0] * len(traced)
+        in_column = [[] for _ in self.columns]
+        for i, col in enumerate(traced):
+            in_column[col].append(i)
+        for i in range(len(instructions) - 3, -1, -3):
+            how_many, from_col, to_col = instructions[i], instructions[i+1] - 1, instructions[i+2] - 1
+            if from_col == to_col:
+                # Moves within a column do not change it (see move)
+                continue
+            staying, moved_back = [], []
+            for t in in_column[to_col]:
+                depth = depths[t]
+                if depth < how_many:
+                    # The box was moved by this instruction
+                    depths[t] = how_many - 1 - depth if reverse_order else depth
+                    moved_back.append(t)
+                else:
+                    depths[t] = depth - how_many
+                    staying.append(t)
+            for t in in_column[from_col]:
+                depths[t] += how_many
+            in_column[to_col] = staying
+            in_column[from_col].extend(moved_back)
+        # Find the columns where the traced positions started
+        start_columns = [0] * len(traced)
+        for col, positions in enumerate(in_column):
+            for t in positions:
+                start_columns[t] = col
+        return ''.join([self.columns[start_columns[t]][-1 - depths[t]] for t in range(len(traced))])\
+            .replace('[','')\
+            .replace(']','')
+
+    def copy(self) -> 'CratesProblem':
+        return CratesProblem([list(col) for col in self.columns])
 
     def get_last_crates(self) -> str:
         '''
         Obtain the letters of the boxes on top, in order
         '''
-        return ''.join([col[0] for col in self.columns])\
+        return ''.join([col[-1] for col in self.columns])\
             .replace('[','')\
             .replace(']','')
 
@@ -47,15 +115,14 @@ class CratesProblem():
         '''
         Entirely unnecessary code for printing the crates problem neatly on stdin
         '''
-        indices = [0 for _ in self.columns]
         max_height = max([len(col) for col in self.columns])
         lines = []
         for y in range(max_height):
             line_to_print = ''
-            for x, col in enumerate(self.columns):
-                if len(col) >= max_height-y:
-                    line_to_print += f'{col[indices[x]]} '
-                    indices[x] += 1
+            for col in self.columns:
+                height = max_height - y     # 1 is the crate at the bottom
+                if len(col) >= height:
+                    line_to_print += f'{col[height-1]} '
                 else:
                     line_to_print += ' '*4
             lines.append(line_to_print)
@@ -63,13 +130,22 @@ class CratesProblem():
         return '\n'.join(lines)
 
 
-def process_input(lines:List[str]) -> Tuple[CratesProblem, List[str]]:
-    crates_columns = ceil(len(lines[0])/4)  # "[X] " + last element does not have a space, so we use ceil
-    columns = [deque([]) for _ in range(crates_columns)]    # This list will contain all of our columns
-    for i, line in enumerate(lines):
+def compile_instructions(instruction_lines:Iterable[str]) -> array:
+    '''
+    Parse the instructions once into a packed array of (how_many, from_col, to_col) triplets.
+    '''
+    return array('l', map(int, chain.from_iterable(
+        instruction_regex.match(inst).groups() for inst in instruction_lines if inst)))
+
+
+def process_input(lines:Iterable[str]) -> Tuple[CratesProblem, array]:
+    lines = iter(lines)
+    first_line = next(lines)
+    crates_columns = ceil(len(first_line)/4)  # "[X] " + last element does not have a space, so we use ceil
+    columns = [[] for _ in range(crates_columns)]    # This list will contain all of our columns
+    for line in chain([first_line], lines):
         if line == '':
             # Start to parse instruction lines
-            instruction_lines = lines[i+1:]
             break
         elif all([str(i+1) in line for i in range(crates_columns)]):
             # Last line of crates input contains all numbers (1...crates_columns): skip it
@@ -81,31 +157,51 @@ def process_input(lines:List[str]) -> Tuple[CratesProblem, List[str]]:
                 # The space may be empty
                 if boxes[col] != '':
                     columns[col].append(boxes[col])
+    # Boxes were read from the top, but columns go from the bottom
+    for col in columns:
+        col.reverse()
     crates_problem = CratesProblem(columns)
-    return crates_problem, instruction_lines
+    # The rest of the lines are the instructions
+    return crates_problem, compile_instructions(lines)
 
 
 def exec_instruction(problem:CratesProblem, instruction:str, model='CrateMover 9000'):
     # Use regex to obtain the parameters for the move function from the text
-    m = re.match(r'move (?P<how_many>\d+) from (?P<from_col>\d+) to (?P<to_col>\d+)',
-                instruction)
-    params = {k: int(val) for k, val in m.groupdict().items()}
-    problem.move(**params, model=model)
+    how_many, from_col, to_col = map(int, instruction_regex.match(instruction).groups())
+    problem.move(from_col, to_col, how_many, model=model)
+
+
+def parse(lines:Iterable[str]) -> Tuple[CratesProblem, array]:
+    return process_input(lines)
+
+
+def solve(crates:CratesProblem, instructions:array, model='CrateMover 9000') -> CratesProblem:
+    # Work on a copy of the columns, so the parsed problem can be reused by both parts
+    crates = crates.copy()
+    crates.run(instructions, model=model)
+    return crates
+
+
+def part1(parsed:Tuple[CratesProblem, array]) -> str:
+    # Only the boxes on top are needed, so there is no need to simulate the whole problem
+    crates, instructions = parsed
+    return crates.trace_last_crates(instructions, model='CrateMover 9000')
+
+
+def part2(parsed:Tuple[CratesProblem, array]) -> str:
+    crates, instructions = parsed
+    return crates.trace_last_crates(instructions, model='CrateMover 9001')
 
 
 if __name__ == '__main__':
-    load_dotenv()
-    lines = get_data(day=5, year=2022).splitlines()
+    lines = iter_input_lines(day=5)
+    crates, instructions = parse(lines)
     # Problem #1
-    crates, instructions = process_input(lines)
-    for inst in instructions:
-        exec_instruction(crates, inst)
-    print(crates)
-    print(f"The highest crates are {crates.get_last_crates()}")
+    final_crates = solve(crates, instructions, model='CrateMover 9000')
+    print(final_crates)
+    print(f"The highest crates are {final_crates.get_last_crates()}")
     print("==========")
     # Problem #2
-    crates, instructions = process_input(lines)
-    for inst in instructions:
-        exec_instruction(crates, inst, model='CrateMover 9000')
-    print(crates)
-    print(f"The highest crates are {crates.get_last_crates()}")
+    final_crates = solve(crates, instructions, model='CrateMover 9001')
+    print(final_crates)
+    print(f"The highest crates are {final_crates.get_last_crates()}")
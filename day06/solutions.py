@@ -1,21 +1,69 @@
-from aocd import get_data
-from dotenv import load_dotenv
+from typing import Dict, Iterable
+
+from aoc.inputs import iter_input_chunks
+
+MARKER_WINDOWS = (4, 14)
+# The signal is a single line: the runner passes it to parse in chunks of bytes
+INPUT_CHUNKS = True
+
+
+def find_markers(chunks:Iterable[str|bytes], windows:Iterable[int]=MARKER_WINDOWS) -> Dict[int,int]:
+    '''
+    Find the markers for all the window sizes in a single pass over the signal, which can be
+    given in chunks (of characters or bytes). Returns {window: position after the marker}.
+    '''
+    pending = sorted(set(windows), reverse=True)
+    markers = {}
+    if not pending:
+        return markers
+    window = pending.pop()  # The smallest window is always the first to be found
+    last_seen = {}          # character -> position of its last occurrence (1-based)
+    run_start = 0           # characters after this position are all different
+    position = 0
+    for chunk in chunks:
+        # The signal ends at the first newline
+        end = chunk.find(b'\n' if isinstance(chunk, bytes) else '\n')
+        if end != -1:
+            chunk = chunk[:end]
+        for char in chunk:
+            position += 1
+            previous = last_seen.get(char, 0)
+            if previous > run_start:
+                run_start = previous
+            last_seen[char] = position
+            # The last (position - run_start) characters are all different
+            while position - run_start >= window:
+                markers[window] = position
+                if not pending:
+                    return markers
+                window = pending.pop()
+        if end != -1:
+            break
+    raise ValueError(f'The signal does not contain a marker of {window} different characters.')
+
+
+def find_marker(signal:str, window:int) -> int:
+    return find_markers([signal], [window])[window]
+
+
+def parse(lines:Iterable[str|bytes]) -> Dict[int,int]:
+    # Both markers are found while reading the signal
+    return find_markers(lines, MARKER_WINDOWS)
+
+
+def part1(markers:Dict[int,int]) -> int:
+    return markers[4]
+
+
+def part2(markers:Dict[int,int]) -> int:
+    # Very similar, but the number of characters is 14 rather than 4
+    return markers[14]
+
 
 if __name__ == '__main__':
-    load_dotenv()
-    signal = get_data(day=6, year=2022)
+    # The signal is a single line, possibly very long: read it in chunks
+    markers = find_markers(iter_input_chunks(day=6), MARKER_WINDOWS)
     # Problem 1
-    for i in range(len(signal)-3):
-        # Iterate over the possible starting positions of the window
-        # and check if removing duplicates the length remains the same:
-        # in that case, the set of characters contains all different
-        # chars and our starting point is i+4
-        if len(set(signal[i:i+4])) == 4:
-            break
-    print(f"The packet starts from charater {i+4}")
+    print(f"The packet starts from charater {part1(markers)}")
     # Problem 2
-    for i in range(len(signal)-13):
-        # Very similar, but the number of characters is 14 rather than 4
-        if len(set(signal[i:i+14])) == 14:
-            break
-    print(f"The message starts from charater {i+14}")
+    print(f"The message starts from charater {part2(markers)}")
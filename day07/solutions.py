@@ -1,12 +1,15 @@
-from typing import List, Tuple
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Iterable, List, Tuple
 
-from aocd import get_data
-from dotenv import load_dotenv
+from aoc.inputs import iter_input_lines
 
 class File():
     '''
     Represents a file, with a name and a size.
     '''
+    __slots__ = ('name', 'size')
+
     def __init__(self, name:str, size:int) -> None:
         self.name = name
         self.size = size
@@ -20,49 +23,78 @@ class File():
 
 class Folder():
     '''
-    Represents a folder, with a name, a parent folder and a list of files and folders it contains.
-    Files and folders can be added to these lists as they are discovered.
-    Its size can be computed recursively summing the size of files that are directly contained by the 
-    folder with the size of files contained in children folders.
+    Represents a folder, with a name, a parent folder and the files and folders it contains,
+    indexed by name. Files and folders can be added as they are discovered.
+    The size of the folder (files directly contained by the folder plus files contained in
+    children folders) is kept up to date as files are added, so it can be read at any time.
     '''
-    def __init__(self, name:str, filelist:List, childlist:List, parent_dir=None) -> None:
+    __slots__ = ('name', 'parent_dir', 'files', 'children', 'size')
+
+    def __init__(self, name:str, parent_dir=None) -> None:
         self.name = name
         self.parent_dir = parent_dir
-        self.filelist = filelist
-        self.childlist  = childlist
-        self.size = None
+        self.files = {}
+        self.children = {}
+        self.size = 0
 
     def get_name(self):
         return self.name
 
     def get_filelist(self):
-        return self.filelist
+        return list(self.files.values())
 
     def get_dirlist(self):
-        return self.childlist
-    
+        return list(self.children.values())
+
     def get_parent_dir(self):
         return self.parent_dir
 
-    def add_file(self, file):
-        self.filelist.append(file)
-
-    def add_children(self, folder):
-        self.childlist.append(folder)
+    def get_child(self, name:str):
+        return self.children.get(name)
+
+    def _add_to_size(self, delta:int):
+        # The size of all the ancestors changes too
+        folder = self
+        while folder is not None:
+            folder.size += delta
+            folder = folder.parent_dir
+
+    def add_file(self, file:File):
+        # Listing a folder twice does not count its files twice
+        previous = self.files.get(file.name)
+        self.files[file.name] = file
+        self._add_to_size(file.size - (previous.size if previous is not None else 0))
+
+    def add_children(self, folder) -> 'Folder':
+        '''
+        Add `folder` to the children, unless a folder with the same name is already there.
+        Returns the child with that name.
+        '''
+        if folder.name in self.children:
+            return self.children[folder.name]
+        folder.parent_dir = self
+        self.children[folder.name] = folder
+        if folder.size:
+            self._add_to_size(folder.size)
+        return folder
 
     def get_size(self):
-        # Only compute size once, since structure doesn't change after initialization
-        if self.size is None:
-            # Sum of elements of current folder + sum of elements of contained folders
-            self.size = sum(map(lambda f: f.get_size(), self.filelist)) + \
-                        sum(map(lambda d: d.get_size(), self.childlist))
         return self.size
 
 
-def create_filesystem(instructions:List[str]) -> Tuple[Folder, List[Folder]]:
-    root_dir = Folder(name='/', filelist=[], childlist=[], parent_dir=None)
+def create_filesystem(instructions:Iterable[str]) -> Tuple[Folder, List[Folder]]:
+    root_dir = Folder(name='/')
     current_dir = root_dir
     found_directories = [root_dir]
+
+    def get_or_create_child(dirname:str) -> Folder:
+        child = current_dir.get_child(dirname)
+        if child is None:
+            # Instantiate the directory and add it to the found ones
+            child = current_dir.add_children(Folder(dirname))
+            found_directories.append(child)
+        return child
+
     for inst in instructions:
         if inst.startswith('$'):
             # COMMANDS
@@ -71,56 +103,98 @@ def create_filesystem(instructions:List[str]) -> Tuple[Folder, List[Folder]]:
             # and not dealt with here.
             if inst.startswith('$ cd'):
                 # cd: change current directory
-                # It makes the assumption that the directory we want to move
-                # to has been discovered with ls first.
-                dirname = inst.split(' ')[-1]
+                # If the directory has not been discovered with ls first, it is created.
+                dirname = inst[5:]
                 # Is it cd .. or cd dirname or cd /?
-                if dirname == '..': current_dir = current_dir.get_parent_dir() 
+                if dirname == '..': current_dir = current_dir.get_parent_dir()
                 elif dirname == '/': current_dir = root_dir
-                else:
-                    for child in current_dir.get_dirlist():
-                        if child.name == dirname:
-                            current_dir = child
-                            break
+                else: current_dir = get_or_create_child(dirname)
         elif inst.startswith('dir'):
             # DIRECTORY DISCOVERY
-            # Instantiate the directory and add it to the found ones
-            dirname = inst.split(' ')[-1]
-            dir = Folder(dirname, filelist=[], childlist=[], parent_dir=current_dir)
-            found_directories.append(dir)
-            # Also add this folder to the parent's childlist
-            current_dir.add_children(dir)
-        else:
+            get_or_create_child(inst[4:])
+        elif inst:
             # FILE DISCOVERY
-            # Add the file to the current directory's filelist
+            # Add the file to the current directory's files
             size, filename = inst.split(' ')
-            size = int(size)
-            current_dir.add_file(File(filename, size))
+            current_dir.add_file(File(filename, int(size)))
     return root_dir, found_directories
 
 
-if __name__ == '__main__':
-    load_dotenv()
-    lines = get_data(day=7, year=2022).splitlines()
+class SizeIndex():
+    '''
+    Directories sorted by size, with the prefix sums of their sizes, to answer many queries
+    on the sizes in logarithmic time. Sizes are read when the index is built, so it has to be
+    built again if files are added later.
+    '''
+    def __init__(self, directories:Iterable[Folder]) -> None:
+        self.directories = sorted(directories, key=lambda dir: dir.get_size())
+        self.sizes = [dir.get_size() for dir in self.directories]
+        # prefix_sums[i] is the sum of the i smallest sizes
+        self.prefix_sums = [0] + list(accumulate(self.sizes))
+
+    def sum_at_most(self, threshold:int) -> int:
+        '''
+        Sum of the sizes of the directories with size <= threshold.
+        '''
+        return self.prefix_sums[bisect_right(self.sizes, threshold)]
+
+    def smallest_at_least(self, threshold:int) -> Folder|None:
+        '''
+        The smallest directory with size >= threshold, or None if there is none.
+        '''
+        i = bisect_left(self.sizes, threshold)
+        return self.directories[i] if i < len(self.directories) else None
+
+    def largest(self, k:int) -> List[Folder]:
+        '''
+        The k largest directories, from the largest.
+        '''
+        return self.directories[:-k-1:-1] if k > 0 else []
+
+    def __len__(self) -> int:
+        return len(self.directories)
+
+
+def parse(lines:Iterable[str]) -> Tuple[Folder, SizeIndex]:
     filesystem, found_directories = create_filesystem(lines)
+    return filesystem, SizeIndex(found_directories)
+
+
+def sum_of_small_directories(index:SizeIndex, at_most:int=100000) -> int:
+    return index.sum_at_most(at_most)
+
+
+def find_directory_to_delete(filesystem:Folder, index:SizeIndex,
+                             total_space:int=70000000, needed_space:int=30000000) -> Folder:
+    occupied_space = filesystem.get_size()
+    delete_at_least = occupied_space - (total_space - needed_space)
+    dir = index.smallest_at_least(delete_at_least)
+    if dir is None:
+        raise ValueError(f'No directory is big enough to free {delete_at_least}.')
+    return dir
+
+
+def part1(parsed:Tuple[Folder, SizeIndex]) -> int:
+    _, index = parsed
+    return sum_of_small_directories(index)
+
+
+def part2(parsed:Tuple[Folder, SizeIndex]) -> int:
+    return find_directory_to_delete(*parsed).get_size()
+
+
+if __name__ == '__main__':
+    lines = iter_input_lines(day=7)
+    filesystem, index = parse(lines)
 
     # Problem 1
-    under_100000_sum = 0
-    for dir in found_directories:
-        dir_size = dir.get_size()
-        if dir_size <= 100000:
-            under_100000_sum += dir_size
+    under_100000_sum = sum_of_small_directories(index)
     print(f'The sum of sizes of directories occupying at most 100000 is: {under_100000_sum}')
 
     # Problem 2
     total_space = 70000000
     needed_space = 30000000
-    occupied_space = filesystem.get_size()
-    delete_at_least = occupied_space - (total_space - needed_space)
+    delete_at_least = filesystem.get_size() - (total_space - needed_space)
     print(f"We need to delete at least {delete_at_least} from the device")
-    sorted_dirs = sorted(found_directories, key=lambda dir: dir.get_size())
-    for dir in sorted_dirs:
-        dir_size = dir.get_size()
-        if dir_size >= delete_at_least:
-            break
+    dir = find_directory_to_delete(filesystem, index, total_space, needed_space)
     print(f"This can be achieved by removing dir {dir.get_name()}, occupying {dir.get_size()} of space")
@@ -1,16 +1,31 @@
-from typing import List, Tuple
+import tempfile
+from typing import Iterable, List, Tuple
 import numpy as np
 
-from aocd import get_data
-from dotenv import load_dotenv
+from aoc.inputs import iter_input_lines
 
 
-def create_grid(lines:List[str]) -> np.ndarray:
-    grid = np.empty((len(lines[0]), len(lines[0])), dtype=np.int32)
-    for i, line in enumerate(lines):
-        row = [int(x) for x in list(line)]    # From string to List of ints
-        grid[i] = np.asarray(row, dtype=np.int32)
-    return grid  
+def grid_from_buffer(data:bytes) -> np.ndarray:
+    '''
+    Parse the heights from the text of the map, with one call to np.frombuffer.
+    The grid does not need to be square.
+    '''
+    data = data.rstrip(b'\r\n')
+    # Windows line endings are two bytes long
+    data = data.replace(b'\r\n', b'\n')
+    width = data.find(b'\n')
+    if width == -1:
+        width = len(data)
+    if (len(data) + 1) % (width + 1) != 0:
+        raise ValueError('All the rows of the map must have the same length.')
+    height = (len(data) + 1) // (width + 1)
+    # Pad with a final newline so that every row is (width + 1) bytes long, then drop the newlines
+    chars = np.frombuffer(data + b'\n', dtype=np.uint8).reshape(height, width + 1)[:, :width]
+    return chars - ord('0')
+
+
+def create_grid(lines:Iterable[str]) -> np.ndarray:
+    return grid_from_buffer('\n'.join(lines).encode())
 
 
 def middle_grid_iterator(h_size:int, w_size:int):
@@ -35,15 +50,39 @@ def is_visible(tree_index:Tuple[int, int], grid:np.ndarray):
     )
 
 
+def visible_from_start(grid:np.ndarray, axis:int) -> np.ndarray:
+    '''
+    Mask of the trees that are taller than all the trees before them along `axis`.
+    '''
+    tallest_so_far = np.maximum.accumulate(grid, axis=axis)
+    visible = np.ones(grid.shape, dtype=bool)
+    # The first tree is always visible, the others need to be taller than the tallest before them
+    after_first = [slice(None)] * grid.ndim
+    before_last = [slice(None)] * grid.ndim
+    after_first[axis], before_last[axis] = slice(1, None), slice(None, -1)
+    visible[tuple(after_first)] = grid[tuple(after_first)] > tallest_so_far[tuple(before_last)]
+    return visible
+
+
+def get_visibility_mask(grid:np.ndarray) -> np.ndarray:
+    '''
+    Mask of the trees that can be seen from outside the grid, computed with the cumulative
+    maxima of the heights in the four directions.
+    '''
+    mask = visible_from_start(grid, axis=1)                       # Left
+    mask |= visible_from_start(grid[:, ::-1], axis=1)[:, ::-1]    # Right
+    mask |= visible_from_start(grid, axis=0)                      # Top
+    mask |= visible_from_start(grid[::-1], axis=0)[::-1]          # Bottom
+    return mask
+
+
+def get_visible_trees(grid:np.ndarray) -> Tuple[int, np.ndarray]:
+    mask = get_visibility_mask(grid)
+    return int(np.count_nonzero(mask)), mask
+
+
 def count_visible_trees(grid:np.ndarray) -> int:
-    # Starting point is the sum of the two sides of the grid * 2
-    # 4 because the angles are not to be repeated in the count
-    # (all trees in the border are visible)
-    h_size, w_size = np.shape(grid)[0], np.shape(grid)[1]
-    visible_trees = ((w_size + h_size) * 2) - 4
-    for tree_index in middle_grid_iterator(h_size, w_size):
-        if is_visible(tree_index, grid):
-            visible_trees += 1
+    visible_trees, _ = get_visible_trees(grid)
     return visible_trees
 
 
@@ -79,22 +118,193 @@ def compute_scenic_score(tree_index:Tuple[int, int], grid:np.ndarray):
     return scores['left'] * scores['right'] * scores['bottom'] * scores['top']
     
 
-def get_best_scenic_score(grid:np.ndarray):
-    h_size, w_size = np.shape(grid)[0], np.shape(grid)[1]
-    best_scenic_score = 0
-    best_index = (0,0)
-    for tree_index in middle_grid_iterator(h_size, w_size):
-        score = compute_scenic_score(tree_index, grid)
-        if score > best_scenic_score:
-            best_scenic_score = score
-            best_index = tree_index
+def viewing_distances_from_top(grid:np.ndarray, blockers:np.ndarray|None=None,
+                               first_row:int=0) -> np.ndarray:
+    '''
+    Number of trees each tree can see looking up.
+    The rows are swept from the top, keeping for each column a monotonic stack of the trees
+    that can still block the view. Since heights go from 0 to 9 the stack has at most 10
+    levels, so it is stored as a table: blockers[h, x] is the row of the last tree of
+    height >= h in column x (0, the edge, if there is none). All columns are swept together.
+    A grid can be swept in horizontal tiles passing the same `blockers` table to consecutive
+    tiles, with the index of their `first_row` in the whole grid.
+    '''
+    h_size, w_size = np.shape(grid)
+    if blockers is None:
+        levels = int(grid.max()) + 1 if grid.size else 0
+        blockers = np.zeros((levels, w_size), dtype=np.int32)
+    level_ids = np.arange(len(blockers))[:, None]
+    columns = np.arange(w_size)
+    distances = np.empty((h_size, w_size), dtype=np.int32)
+    for i in range(h_size):
+        row, y = grid[i], first_row + i
+        # The view stops at the last tree at least as tall as this one
+        np.subtract(y, blockers[row, columns], out=distances[i])
+        # This tree is the last one of its height and of all the lower ones
+        np.putmask(blockers, level_ids <= row, y)
+    return distances
+
+
+def get_scenic_scores(grid:np.ndarray) -> np.ndarray:
+    '''
+    Matrix of the scenic scores of all the trees, in O(rows * cols).
+    '''
+    # Sweeps go along the rows, so the left and right views are computed on the transposed grid
+    transposed = np.ascontiguousarray(grid.T)
+    scores = viewing_distances_from_top(grid).astype(np.int64)                # Top
+    scores *= viewing_distances_from_top(grid[::-1])[::-1]                    # Bottom
+    scores *= viewing_distances_from_top(transposed).T                        # Left
+    scores *= viewing_distances_from_top(transposed[::-1])[::-1].T            # Right
+    return scores
+
+
+def get_best_scenic_score(grid:np.ndarray) -> Tuple[int, Tuple[int, int]]:
+    scores = get_scenic_scores(grid)
+    best_index = np.unravel_index(np.argmax(scores), scores.shape)
+    return int(scores[best_index]), tuple(int(i) for i in best_index)
+
+
+def get_top_scenic_scores(grid:np.ndarray, k:int) -> List[Tuple[int, Tuple[int, int]]]:
+    '''
+    The k best scenic scores with their locations, from the best.
+    '''
+    scores = get_scenic_scores(grid).ravel()
+    k = min(k, scores.size)
+    if k <= 0:
+        return []
+    top = np.argpartition(-scores, k-1)[:k]
+    top = top[np.argsort(-scores[top], kind='stable')]
+    return [(int(scores[i]), tuple(int(c) for c in np.unravel_index(i, grid.shape))) for i in top]
+
+
+HEIGHT_LEVELS = 10     # Heights are single digits
+HEIGHTS_TABLE = bytes.maketrans(b'0123456789', bytes(range(HEIGHT_LEVELS)))
+TILE_CELLS = 1 << 20
+
+
+def create_grid_memmap(lines:Iterable[str], path:str) -> np.memmap:
+    '''
+    Write the heights of the map as uint8 to the file at `path`, one line at a time, and
+    memory-map it. Only one line of the map is in memory at any time.
+    '''
+    width, height = None, 0
+    with open(path, 'wb') as f:
+        for line in lines:
+            if not line:
+                continue
+            if width is None:
+                width = len(line)
+            elif len(line) != width:
+                raise ValueError('All the rows of the map must have the same length.')
+            f.write(line.encode().translate(HEIGHTS_TABLE))
+            height += 1
+    if height == 0:
+        raise ValueError('The map is empty.')
+    return np.memmap(path, dtype=np.uint8, mode='r', shape=(height, width))
+
+
+def get_tile_rows(grid:np.ndarray, tile_rows:int|None=None) -> int:
+    return tile_rows or max(1, TILE_CELLS // max(np.shape(grid)[1], 1))
+
+
+def iter_tiles(grid:np.ndarray, tile_rows:int|None=None, reverse:bool=False):
+    '''
+    Yield (first_row, tile) for horizontal tiles of the grid, loaded in memory.
+    By default the tiles have about TILE_CELLS trees.
+    '''
+    h_size, _ = np.shape(grid)
+    tile_rows = get_tile_rows(grid, tile_rows)
+    starts = range(0, h_size, tile_rows)
+    for start in (reversed(starts) if reverse else starts):
+        yield start, np.array(grid[start:start+tile_rows])
+
+
+def count_visible_trees_tiled(grid:np.ndarray, tile_rows:int|None=None,
+                              tmp_dir:str|None=None) -> int:
+    '''
+    Like count_visible_trees, but only a tile of the grid is in memory at any time.
+    The maxima of the columns are carried from one tile to the next: a first pass from the
+    bottom stores the maxima below each tile in a temporary memory-mapped file, a second one
+    from the top counts the trees.
+    '''
+    h_size, w_size = np.shape(grid)
+    tile_rows = get_tile_rows(grid, tile_rows)
+    with tempfile.TemporaryFile(dir=tmp_dir) as f:
+        below_max = np.memmap(f, dtype=np.int16, mode='w+', shape=(-(-h_size // tile_rows), w_size))
+        # -1 means there are no trees
+        carry = np.full(w_size, -1, dtype=np.int16)
+        for start, tile in iter_tiles(grid, tile_rows, reverse=True):
+            below_max[start // tile_rows] = carry
+            carry = np.maximum(carry, tile.max(axis=0))
+        visible_trees = count_visible_trees_in_tiles(grid, tile_rows, below_max)
+        del below_max
+    return visible_trees
+
+
+def count_visible_trees_in_tiles(grid:np.ndarray, tile_rows:int, below_max:np.ndarray) -> int:
+    # Second pass of count_visible_trees_tiled, from the top
+    visible_trees, carry = 0, np.full(np.shape(grid)[1], -1, dtype=np.int16)
+    for start, tile in iter_tiles(grid, tile_rows):
+        tile = tile.astype(np.int16)
+        mask = visible_from_start(tile, axis=1)                        # Left
+        mask |= visible_from_start(tile[:, ::-1], axis=1)[:, ::-1]     # Right
+        # Top and bottom: the carried maxima act as an extra row before/after the tile
+        top = np.maximum.accumulate(np.vstack([carry, tile]), axis=0)
+        mask |= tile > top[:-1]
+        bottom = np.maximum.accumulate(np.vstack([below_max[start // tile_rows], tile[::-1]]), axis=0)
+        mask |= tile > bottom[:-1][::-1]
+        carry = top[-1]
+        visible_trees += int(np.count_nonzero(mask))
+    return visible_trees
+
+
+def get_best_scenic_score_tiled(grid:np.ndarray, tile_rows:int|None=None,
+                                tmp_dir:str|None=None) -> Tuple[int, Tuple[int, int]]:
+    '''
+    Like get_best_scenic_score, but only a tile of the grid is in memory at any time.
+    The blockers tables of the vertical sweeps are carried from one tile to the next; the
+    distances looking down are computed first, from the bottom, and kept in a temporary
+    memory-mapped file.
+    '''
+    h_size, w_size = np.shape(grid)
+    with tempfile.TemporaryFile(dir=tmp_dir) as f:
+        bottom = np.memmap(f, dtype=np.int32, mode='w+', shape=(h_size, w_size))
+        blockers = np.zeros((HEIGHT_LEVELS, w_size), dtype=np.int32)
+        for start, tile in iter_tiles(grid, tile_rows, reverse=True):
+            # Rows are swept upwards, numbering them from the bottom
+            bottom[start:start+len(tile)] = viewing_distances_from_top(
+                tile[::-1], blockers, first_row=h_size-start-len(tile))[::-1]
+        best_scenic_score, best_index = -1, (0, 0)
+        blockers = np.zeros((HEIGHT_LEVELS, w_size), dtype=np.int32)
+        for start, tile in iter_tiles(grid, tile_rows):
+            transposed = np.ascontiguousarray(tile.T)
+            scores = viewing_distances_from_top(tile, blockers, first_row=start).astype(np.int64)
+            scores *= bottom[start:start+len(tile)]
+            scores *= viewing_distances_from_top(transposed).T
+            scores *= viewing_distances_from_top(transposed[::-1])[::-1].T
+            y, x = np.unravel_index(np.argmax(scores), scores.shape)
+            if scores[y, x] > best_scenic_score:
+                best_scenic_score, best_index = int(scores[y, x]), (start + int(y), int(x))
+        del bottom
     return best_scenic_score, best_index
 
 
+def parse(lines:Iterable[str]) -> np.ndarray:
+    return create_grid(list(lines))
+
+
+def part1(grid:np.ndarray) -> int:
+    return count_visible_trees(grid)
+
+
+def part2(grid:np.ndarray) -> int:
+    best_scenic_score, _ = get_best_scenic_score(grid)
+    return best_scenic_score
+
+
 if __name__ == '__main__':
-    load_dotenv()
-    lines = get_data(day=8, year=2022).splitlines()
-    grid = create_grid(lines)
+    lines = iter_input_lines(day=8)
+    grid = parse(lines)
 
     # Problem 1
     visible_trees = count_visible_trees(grid)
@@ -1,8 +1,11 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from enum import Enum
-from typing import List
+from typing import Dict, Iterable, List, Tuple
 
-from aocd import get_data
-from dotenv import load_dotenv
+from aoc.inputs import iter_input_lines
+from aoc.profiling import hot_path
 
 class Direction(str, Enum):
     RIGHT = 'R'
@@ -80,25 +83,225 @@ class Rope():
         return '\n'.join(["".join(g) for g in grid])
     
 
-def parse_instructions(lines:List[str]):
-    instructions = []
+def merge_intervals(intervals:List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    '''
+    Merge closed intervals of cells that overlap or touch.
+    '''
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def is_covered(intervals:List[Tuple[int, int]]|None, cell:int) -> bool:
+    # Intervals must be merged (sorted and disjoint)
+    if not intervals:
+        return False
+    i = bisect_right(intervals, (cell, float('inf'))) - 1
+    return i >= 0 and intervals[i][1] >= cell
+
+
+def count_cells(rows:Dict[int, List], columns:Dict[int, List]) -> int:
+    '''
+    Count the cells covered by horizontal segments (rows: y -> [(x0, x1), ...]) and
+    vertical segments (columns: x -> [(y0, y1), ...]), without listing them.
+    Intervals must be merged (see merge_intervals).
+    The cells where a horizontal and a vertical segment cross are counted once: they are
+    found sweeping the columns from the left, keeping a Fenwick tree of the rows that have
+    a horizontal segment at the current column.
+    '''
+    cells = sum(x1 - x0 + 1 for intervals in rows.values() for x0, x1 in intervals) + \
+            sum(y1 - y0 + 1 for intervals in columns.values() for y0, y1 in intervals)
+    if not rows or not columns:
+        return cells
+    sorted_rows = sorted(rows)
+    row_ids = {y: i + 1 for i, y in enumerate(sorted_rows)}
+    tree = [0] * (len(sorted_rows) + 1)
+
+    def update(i:int, delta:int):
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(i:int) -> int:
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    # At the same x, segments are added (0) or removed (1) before the columns are queried (2)
+    events = []
+    for y, intervals in rows.items():
+        for x0, x1 in intervals:
+            events.append((x0, 0, row_ids[y], 0))
+            events.append((x1 + 1, 1, row_ids[y], 0))
+    for x, intervals in columns.items():
+        for y0, y1 in intervals:
+            events.append((x, 2, y0, y1))
+    for _, kind, a, b in sorted(events):
+        if kind == 0:
+            update(a, 1)
+        elif kind == 1:
+            update(a, -1)
+        else:
+            cells -= prefix(bisect_right(sorted_rows, b)) - prefix(bisect_left(sorted_rows, a))
+    return cells
+
+
+class RopeSimulator():
+    '''
+    Rope whose knots are stored in a flat list of coordinates: [x0, y0, x1, y1, ...], where
+    knot 0 is the head. Visited positions are only kept for the knots in `tracked_knots`
+    (by default the tail), as sets of integers packing both coordinates.
+    Once the rope is straight behind the head, every knot just follows the head one cell at
+    a time until the end of the instruction: the rest of the instruction is then applied at
+    once, and the visited cells are stored as a segment.
+    '''
+    DIRECTIONS = {Direction.RIGHT: (1, 0), Direction.LEFT: (-1, 0),
+                  Direction.UP:    (0, 1), Direction.DOWN: (0, -1)}
+    PACKING = 1 << 32   # Packed position: x * PACKING + y, for |y| < 2**31
+
+    def __init__(self, nodes=2, tracked_knots:Iterable[int]|None=None) -> None:
+        if nodes < 1:
+            raise ValueError('A rope needs at least one knot.')
+        self.nodes = nodes
+        self.knots = [0] * (2 * nodes)
+        tracked_knots = [nodes - 1] if tracked_knots is None else tracked_knots
+        # The starting position counts as visited
+        self.visited_positions = {knot % nodes: {0} for knot in tracked_knots}
+        # (x0, y0, x1, y1) segments of cells visited during bulk moves
+        self.visited_segments = {knot: [] for knot in self.visited_positions}
+
+    def get_position(self, knot:int) -> Tuple[int, int]:
+        return self.knots[2*knot], self.knots[2*knot+1]
+
+    def count_visited_positions(self, knot:int=-1) -> int:
+        knot = knot % self.nodes
+        positions, segments = self.visited_positions[knot], self.visited_segments[knot]
+        if not segments:
+            return len(positions)
+        rows, columns = defaultdict(list), defaultdict(list)
+        for x0, y0, x1, y1 in segments:
+            if y0 == y1:
+                rows[y0].append((x0, x1))
+            else:
+                columns[x0].append((y0, y1))
+        rows = {y: merge_intervals(intervals) for y, intervals in rows.items()}
+        columns = {x: merge_intervals(intervals) for x, intervals in columns.items()}
+        # Single positions only count if they are not on a segment
+        outside = 0
+        for position in positions:
+            x = (position + self.PACKING // 2) // self.PACKING
+            y = position - x * self.PACKING
+            if not (is_covered(rows.get(y), x) or is_covered(columns.get(x), y)):
+                outside += 1
+        return count_cells(rows, columns) + outside
+
+    def move(self, direction:Direction, repeat:int=1):
+        dx, dy = self.DIRECTIONS[direction]
+        for done in range(1, repeat + 1):
+            if self.step(dx, dy):
+                self.move_straight(dx, dy, repeat - done)
+                break
+
+    @hot_path
+    def step(self, dx:int, dy:int) -> bool:
+        '''
+        Move the head by (dx, dy), then let every knot follow the previous one.
+        Returns True if every knot moved by (dx, dy) too: then the rope is straight behind the head.
+        '''
+        knots, visited, packing = self.knots, self.visited_positions, self.PACKING
+        knots[0] += dx
+        knots[1] += dy
+        if 0 in visited:
+            visited[0].add(knots[0] * packing + knots[1])
+        straight = True
+        for i in range(2, len(knots), 2):
+            diff_x, diff_y = knots[i-2] - knots[i], knots[i-1] - knots[i+1]
+            if -1 <= diff_x <= 1 and -1 <= diff_y <= 1:
+                # This knot is still adjacent, so the following ones do not move either
+                return False
+            # Move by one in the direction of the previous knot (diagonally if needed)
+            move_x, move_y = (diff_x > 0) - (diff_x < 0), (diff_y > 0) - (diff_y < 0)
+            knots[i] += move_x
+            knots[i+1] += move_y
+            straight = straight and move_x == dx and move_y == dy
+            if i // 2 in visited:
+                visited[i // 2].add(knots[i] * packing + knots[i+1])
+        return straight
+
+    def move_straight(self, dx:int, dy:int, repeat:int):
+        '''
+        Move the whole rope by `repeat` cells in the direction (dx, dy). The rope must be
+        straight behind the head, so that every knot moves exactly like the head.
+        '''
+        if repeat <= 0:
+            return
+        for knot, segments in self.visited_segments.items():
+            x, y = self.get_position(knot)
+            first, last = (x + dx, y + dy), (x + repeat * dx, y + repeat * dy)
+            segments.append((*min(first, last), *max(first, last)))
+        for i in range(0, len(self.knots), 2):
+            self.knots[i] += repeat * dx
+            self.knots[i+1] += repeat * dy
+
+    def run_instructions(self, instructions:array):
+        '''
+        Execute the instructions compiled by `compile_instructions`.
+        '''
+        it = iter(instructions)
+        for direction, repeat in zip(it, it):
+            self.move(INSTRUCTION_DIRECTIONS[direction], repeat)
+
+
+INSTRUCTION_DIRECTIONS = (Direction.RIGHT, Direction.LEFT, Direction.UP, Direction.DOWN)
+DIRECTION_CODES = {direction.value: code for code, direction in enumerate(INSTRUCTION_DIRECTIONS)}
+
+
+def compile_instructions(lines:Iterable[str]) -> array:
+    '''
+    Parse the instructions once into a packed array of (direction code, repeat) pairs,
+    where the code is the index of the direction in INSTRUCTION_DIRECTIONS.
+    '''
+    instructions = array('l')
     for line in lines:
+        if not line:
+            continue
         direction, how_many = line.split(' ')
-        instructions.append({'direction': direction,
-                             'repeat':    int(how_many)})
+        instructions.append(DIRECTION_CODES[direction])
+        instructions.append(int(how_many))
     return instructions
-        
+
+
+def parse(lines:Iterable[str]) -> array:
+    return compile_instructions(lines)
+
+
+def count_tail_positions(instructions:array, nodes:int) -> int:
+    rope = RopeSimulator(nodes=nodes)
+    rope.run_instructions(instructions)
+    return rope.count_visited_positions(-1)
+
+
+def part1(instructions:array) -> int:
+    return count_tail_positions(instructions, nodes=2)
+
+
+def part2(instructions:array) -> int:
+    return count_tail_positions(instructions, nodes=10)
+
+
 if __name__ == '__main__':
-    load_dotenv()
-    lines = get_data(day=9, year=2022).splitlines()
-    instructions = parse_instructions(lines)
+    lines = iter_input_lines(day=9)
+    instructions = parse(lines)
 
     # Problem 1
-    rope = Rope(nodes=2)
-    rope.run_instructions_on_simulation(instructions)
-    print(f"The tail has visited {len(rope.nodes[-1].visited_positions)} positions.")
+    print(f"The tail has visited {part1(instructions)} positions.")
 
     # Problem 2
-    rope = Rope(nodes=10)
-    rope.run_instructions_on_simulation(instructions)
-    print(f"The tail of the longer rope has visited {len(rope.nodes[-1].visited_positions)} positions.")
+    print(f"The tail of the longer rope has visited {part2(instructions)} positions.")
@@ -1,8 +1,9 @@
-from typing import List, Set
+from typing import Iterable, List, Set
 from enum import Enum
+import numpy as np
 
-from aocd import get_data
-from dotenv import load_dotenv
+from aoc.inputs import iter_input_lines
+from aoc.profiling import hot_path
 
 
 class Op(str, Enum):
@@ -11,13 +12,15 @@ class Op(str, Enum):
 
 
 class CPU():
-    def __init__(self, interesting_ticks:Set) -> None:
+    def __init__(self, interesting_ticks:Set, screen_width:int=40, screen_height:int=6,
+                 sprite_size:int=3) -> None:
         self.X = 1
         self.clock = 0
         self.interesting_ticks = interesting_ticks
         self.signal_strengths = []
-        self.screen = Screen(40, 6, 3)
+        self.screen = Screen(screen_width, screen_height, sprite_size)
 
+    @hot_path
     def tick(self):
         # Update screen
         self.screen.update_screen(self.clock, self.X)
@@ -37,35 +40,65 @@ class CPU():
 
 
 class Screen():
+    '''
+    CRT screen of any size, with a sprite of any width. The pixels of a frame are a uint8
+    array holding the characters to show ('#' or '.'), so frames are rendered without
+    building a string for each pixel.
+    '''
+    LIT, DARK = ord('#'), ord('.')
+
     def __init__(self, width:int=40, height:int=6, sprite_size:int=3) -> None:
         self.width = width
         self.height = height
         self.sprite_width = sprite_size
         self.sprite_pad = (self.sprite_width - 1) / 2
-        self.pixels = [
-            [None for _ in range(self.width)] 
-            for _ in range(self.height)
-        ]
+        self.pixels = np.full((self.height, self.width), self.DARK, dtype=np.uint8)
 
     def tick_to_coord(self, tick:int):
-        # Return row, column
-        return (tick // self.width, tick % self.width)
+        # Return row, column. After the last pixel, the next frame starts from the top
+        return divmod(tick % (self.width * self.height), self.width)
 
     def update_screen(self, tick:int, sprite_pos:int):
         # Note: remember to update screen before updating tick count, so it starts
         # from 0
         y, x = self.tick_to_coord(tick)
         if (sprite_pos - self.sprite_pad) <= x <= (sprite_pos + self.sprite_pad):
-            self.pixels[y][x] = '#'
+            self.pixels[y, x] = self.LIT
         else:
-            self.pixels[y][x] = '.'
+            self.pixels[y, x] = self.DARK
+
+    @hot_path
+    def render_frames(self, trace:np.ndarray) -> np.ndarray:
+        '''
+        Render all the frames drawn by a program from its X register trace (see
+        compile_register_trace), as a (frames, height, width) array. The pixel drawn at
+        each cycle is lit if the sprite, centered in X, covers its column. The pixels of
+        a last incomplete frame that are not drawn stay dark.
+        '''
+        frame_size = self.width * self.height
+        frames = -(-len(trace) // frame_size)
+        pixels = np.full(frames * frame_size, self.DARK, dtype=np.uint8)
+        columns = np.arange(len(trace)) % self.width
+        pixels[:len(trace)][np.abs(trace - columns) <= self.sprite_pad] = self.LIT
+        return pixels.reshape(frames, self.height, self.width)
+
+    def draw(self, trace:np.ndarray, frame:int=-1):
+        '''
+        Show one of the frames drawn by a program (by default the last one).
+        '''
+        self.pixels = self.render_frames(trace)[frame]
+
+    def frame_to_str(self, pixels:np.ndarray) -> str:
+        return '\n'.join([row.tobytes().decode() for row in pixels])
 
     def __str__(self) -> str:
-        return '\n'.join([''.join(row) for row in self.pixels])
+        return self.frame_to_str(self.pixels)
 
 
 def instruction_generator(lines:List[str]):
     for line in lines:
+        if not line:
+            continue
         elems = line.split(' ')
         if len(elems) > 1:
             yield {'op': elems[0], 'param': int(elems[1])}
@@ -73,20 +106,64 @@ def instruction_generator(lines:List[str]):
             yield {'op': elems[0], 'param': None}
 
 
+@hot_path
+def compile_register_trace(instructions:Iterable) -> np.ndarray:
+    '''
+    Return the value of the X register during each cycle of the program: trace[c-1] is the
+    value during cycle c. An addx only changes X at the end of its second cycle, so the
+    changes are put at the cycle where they become visible and summed with one prefix sum.
+    '''
+    params, lengths = [], []
+    for inst in instructions:
+        if inst['op'] == Op.NOOP:
+            params.append(0)
+            lengths.append(1)
+        elif inst['op'] == Op.ADDX:
+            params.append(inst['param'])
+            lengths.append(2)
+        else:
+            raise ValueError(f"Unknown operation {inst['op']}")
+    end_cycles = np.cumsum(np.asarray(lengths, dtype=np.int64))
+    total_cycles = int(end_cycles[-1]) if len(end_cycles) else 0
+    # The change of an instruction ending at cycle c is visible from cycle c+1 (index c)
+    changes = np.zeros(total_cycles + 1, dtype=np.int64)
+    changes[0] = 1
+    changes[end_cycles] = params
+    return np.cumsum(changes)[:total_cycles]
+
+
+def get_signal_strengths(trace:np.ndarray, ticks:Iterable[int]) -> np.ndarray:
+    ticks = np.fromiter(ticks, dtype=np.int64)
+    if len(ticks) and (ticks.min() < 1 or ticks.max() > len(trace)):
+        raise ValueError(f'Ticks must be between 1 and {len(trace)}, the length of the program.')
+    return ticks * trace[ticks - 1]
+
+
+def parse(lines:Iterable[str]) -> np.ndarray:
+    return compile_register_trace(instruction_generator(lines))
+
+
+def part1(trace:np.ndarray) -> int:
+    return int(get_signal_strengths(trace, range(20, 220+1, 40)).sum())
+
+
+def part2(trace:np.ndarray) -> str:
+    screen = Screen(40, 6, 3)
+    screen.draw(trace, frame=0)
+    return str(screen)
+
+
 if __name__ == '__main__':
-    load_dotenv()
-    lines = get_data(day=10, year=2022).splitlines()
-    instructions = list(instruction_generator(lines))
+    lines = iter_input_lines(day=10)
+    trace = parse(lines)
 
     # Problem 1
     interesting_ticks = list(range(20, 220+1, 40))
-    cpu = CPU(set(interesting_ticks))
-    for inst in instructions:
-        cpu.exec_op(**inst)
-    print(f"Signal strengths at ticks {interesting_ticks}: {cpu.signal_strengths}")
-    print(f"Their sum is: {sum(cpu.signal_strengths)}")
+    signal_strengths = get_signal_strengths(trace, interesting_ticks)
+    print(f"Signal strengths at ticks {interesting_ticks}: {signal_strengths.tolist()}")
+    print(f"Their sum is: {signal_strengths.sum()}")
 
     # Problem 2
     print(f"The following image is what is show on the display of "
           f"the device at the end of execution:")
-    print(str(cpu.screen))
+    print(part2(trace))
@@ -1,24 +1,58 @@
+import copy
 import operator
 import re
 from collections import deque
-from math import floor, lcm
+from math import lcm
 from typing import Callable, List
 
-from aocd import get_data
-from dotenv import load_dotenv
+from aoc.inputs import iter_input_lines
+from aoc.profiling import hot_path
+
+def compile_operation(operation:Callable, operation_el1:str, operation_el2:str) -> Callable[[int], int]:
+    '''
+    Turn the operation of a monkey into a function of the old worry level, specialized for
+    the common cases (old * old, old + constant, old * constant), so that the operands do
+    not need to be checked and converted for every item.
+    '''
+    if operation_el1 == 'old' and operation_el2 == 'old':
+        if operation is operator.mul:
+            return lambda worry: worry * worry
+        return lambda worry: operation(worry, worry)
+    if operation_el1 == 'old' or operation_el2 == 'old':
+        constant = int(operation_el2 if operation_el1 == 'old' else operation_el1)
+        if operation is operator.add:
+            return lambda worry: worry + constant
+        if operation is operator.mul:
+            return lambda worry: worry * constant
+        if operation_el1 == 'old':
+            return lambda worry: operation(worry, constant)
+        return lambda worry: operation(constant, worry)
+    constant = operation(int(operation_el1), int(operation_el2))
+    return lambda worry: constant
+
 
 class MonkeyGroup():
     def __init__(self) -> None:
         self.monkeys = []
+        self.by_id = []     # Monkeys indexed by their ID
         self.round = 0
 
     def register_monkey(self, monkey):
         self.monkeys.append(monkey)
-    
+        if monkey.id >= len(self.by_id):
+            self.by_id.extend([None] * (monkey.id + 1 - len(self.by_id)))
+        self.by_id[monkey.id] = monkey
+
+    def get_monkey(self, id:int):
+        monkey = self.by_id[id] if 0 <= id < len(self.by_id) else None
+        if monkey is None:
+            raise ValueError(f'There is no monkey {id}.')
+        return monkey
+
+    @hot_path
     def throw(self, item, to):
-        for monkey in self.monkeys:
-            if monkey.id == to:
-                monkey.receive(item)
+        # Items can only be thrown to registered monkeys (see make_turn)
+        self.by_id[to].items.append(item)
     
     def make_round(self, use_calm:bool=True):
         self.round += 1
@@ -40,6 +74,8 @@ class Monkey():
         self.test_val = test_val
         self.true_val = true_val
         self.false_val = false_val
+        # The operation is compiled once, rather than interpreted for every item
+        self.inspect = compile_operation(operation, operation_el1, operation_el2)
 
     def set_lcm(self, lcm:int):
         self.lcm = lcm
@@ -51,13 +87,9 @@ class Monkey():
             # and 
             # https://www.khanacademy.org/computing/computer-science/cryptography/modarithmetic/a/modular-multiplication
             # show that we just need to take the modulo of the components and the results of the operation
-            return self.op(
-                (worry if self.operation_el1 == 'old' else int(self.operation_el1)) % self.lcm,
-                (worry if self.operation_el2 == 'old' else int(self.operation_el2)) % self.lcm) % self.lcm
+            return self.inspect(worry % self.lcm) % self.lcm
         else:
-            return self.op(
-                (worry if self.operation_el1 == 'old' else int(self.operation_el1)), 
-                (worry if self.operation_el2 == 'old' else int(self.operation_el2)))
+            return self.inspect(worry)
 
     def test(self, worry: int):
         return self.true_val if (worry % self.test_val) == 0 else self.false_val
@@ -65,27 +97,32 @@ class Monkey():
     def receive(self, item):
         self.items.append(item)
     
+    @hot_path
     def make_turn(self, use_calm:bool=True, verbose=False):
-        num_items = len(self.items)
+        # Look up everything needed in the loop once per turn
+        items, inspect, test_val = self.items, self.inspect, self.test_val
+        true_val, false_val, throw = self.true_val, self.false_val, self.manager.throw
+        # Fail before any item is thrown if a target is missing
+        self.manager.get_monkey(true_val)
+        self.manager.get_monkey(false_val)
+        num_items = len(items)
+        self.inspected_items += num_items
         for _ in range(num_items):
             # Take item removing it from queue
-            item = self.items.popleft()
-            self.inspected_items += 1
+            item = items.popleft()
+            # Compute new worry level according to operation
+            new_worry_level = inspect(item)
             if use_calm:
-                # Compute new worry level according to operation
-                new_worry_level = self.compute_new_worry_level(item, modular=False)
                 # Divide by 3
-                new_worry_level = floor(new_worry_level / 3)
+                new_worry_level //= 3
             else:
-                new_worry_level = self.compute_new_worry_level(item, modular=True)
-            # Compute who to throw the item to based on test
-            throw_to_id = self.test(new_worry_level)
-            # Use manager to throw item to other monkeys
-            self.manager.throw(new_worry_level, throw_to_id)
+                new_worry_level %= self.lcm
+            # Throw the item to the other monkey based on test
+            throw(new_worry_level, true_val if new_worry_level % test_val == 0 else false_val)
             if verbose:
                 print(f"Monkey {self.id} inspects item with worry level {item}")
                 print(f"  New worry level is {new_worry_level}")
-                print(f"  The item is thrown to monkey {throw_to_id}")
+                print(f"  The item is thrown to monkey {self.test(new_worry_level)}")
 
 
 def parse_input(lines:List[str]) -> MonkeyGroup:
@@ -136,24 +173,35 @@ def run_simulation(monkey_group: MonkeyGroup, rounds:int, use_calm:bool=True) ->
         monkey_group.make_round(use_calm)
 
 
-if __name__ == '__main__':
-    load_dotenv()
-    lines = get_data(day=11, year=2022).splitlines()
-
-    # Problem 1
-    monkey_group = parse_input(lines)
-    run_simulation(monkey_group, 20, use_calm=True)
+def get_monkey_business(monkey_group:MonkeyGroup, rounds:int, use_calm:bool=True) -> int:
+    # Work on a copy, so the parsed group can be reused by both parts
+    monkey_group = copy.deepcopy(monkey_group)
+    run_simulation(monkey_group, rounds, use_calm=use_calm)
     inspected_items = []
     for monkey in monkey_group.monkeys:
         inspected_items.append(monkey.inspected_items)
     inspected_items = sorted(inspected_items)
-    print(f"The level of monkey business is: {inspected_items[-1]*inspected_items[-2]}")
+    return inspected_items[-1]*inspected_items[-2]
+
+
+def parse(lines:List[str]) -> MonkeyGroup:
+    return parse_input(lines)
+
+
+def part1(monkey_group:MonkeyGroup) -> int:
+    return get_monkey_business(monkey_group, 20, use_calm=True)
+
+
+def part2(monkey_group:MonkeyGroup) -> int:
+    return get_monkey_business(monkey_group, 10000, use_calm=False)
+
+
+if __name__ == '__main__':
+    lines = iter_input_lines(day=11)
+    monkey_group = parse(lines)
+
+    # Problem 1
+    print(f"The level of monkey business is: {part1(monkey_group)}")
 
     # Problem 2
-    monkey_group = parse_input(lines)
-    run_simulation(monkey_group, 10000, use_calm=False)
-    inspected_items = []
-    for monkey in monkey_group.monkeys:
-        inspected_items.append(monkey.inspected_items)
-    inspected_items = sorted(inspected_items)
-    print(f"The level of monkey business is: {inspected_items[-1]*inspected_items[-2]}")
+    print(f"The level of monkey business is: {part2(monkey_group)}")
@@ -1,9 +1,10 @@
 from typing import Dict, List, Tuple
 import numpy as np
 from queue import Queue
-from aocd import get_data
-from dotenv import load_dotenv
+from aoc.inputs import iter_input_lines
+from aoc.profiling import hot_path
 
+@hot_path
 def can_move_at(y, x, from_y, from_x, grid):
     # We are from end to start, so we need to check that between a node and its following
     # node there is a height difference of no more than 1.
@@ -65,7 +66,8 @@ def collect_path(previous_mappings:Dict, start:Tuple[int,int], end:Tuple[int,int
         path.append(current_pos)
     return path
 
-def get_shortest_path(previous_mappings:Dict, start:Tuple[int,int]|str, end:Tuple[int,int]):
+def get_shortest_path(previous_mappings:Dict, start:Tuple[int,int]|str, end:Tuple[int,int],
+                      grid:np.ndarray):
     if start == 'any_a':
         shortest_path_len = 1e10
         shortest_path = []
@@ -102,17 +104,30 @@ def parse_input(lines:List[str]):
     return grid, S_pos, E_pos 
 
 
+def parse(lines:List[str]) -> Tuple[np.ndarray, Tuple[int,int], Tuple[int,int]]:
+    return parse_input(list(lines))
+
+
+def part1(parsed:Tuple[np.ndarray, Tuple[int,int], Tuple[int,int]]) -> int:
+    grid, S_pos, E_pos = parsed
+    previous_mappings = shortest_path_to_E(grid, S_pos, E_pos)
+    shortest_path = get_shortest_path(previous_mappings, S_pos, E_pos, grid)
+    return len(shortest_path) - 1
+
+
+def part2(parsed:Tuple[np.ndarray, Tuple[int,int], Tuple[int,int]]) -> int:
+    grid, _, E_pos = parsed
+    previous_mappings = shortest_path_to_E(grid, 'any_a', E_pos)
+    shortest_path = get_shortest_path(previous_mappings, 'any_a', E_pos, grid)
+    return len(shortest_path) - 1
+
+
 if __name__ == '__main__':
-    load_dotenv()
-    lines = get_data(day=12, year=2022).splitlines()
-    grid, S_pos, E_pos = parse_input(lines)
+    lines = iter_input_lines(day=12)
+    parsed = parse(lines)
 
     # Problem 1
-    previous_mappings = shortest_path_to_E(grid, S_pos, E_pos)
-    shortest_path = get_shortest_path(previous_mappings, S_pos, E_pos)
-    print(f"The shortest path to the end starting from 'S' is: {len(shortest_path) - 1}")
+    print(f"The shortest path to the end starting from 'S' is: {part1(parsed)}")
 
     # Problem 2
-    previous_mappings = shortest_path_to_E(grid, 'any_a', E_pos)
-    shortest_path = get_shortest_path(previous_mappings, 'any_a', E_pos)
-    print(f"The shortest path to the end starting from any 'a' is: {len(shortest_path) - 1}")
+    print(f"The shortest path to the end starting from any 'a' is: {part2(parsed)}")
@@ -2,10 +2,11 @@ import re
 import functools
 from typing import List, Tuple
 
-from aocd import get_data
-from dotenv import load_dotenv
+from aoc.inputs import iter_input_lines
+from aoc.profiling import hot_path
 
 
+@hot_path
 def compare(pair:Tuple):
     l, r = pair
     if isinstance(l, int) and isinstance(r, int):
@@ -55,10 +56,39 @@ def parse_lines(lines:List[str]):
     return packet_pairs
 
 
+def get_correct_pairs_indices(packet_pairs:List[Tuple]) -> List[int]:
+    correct_pairs = []
+    for i in range(1, len(packet_pairs)+1):
+        if compare(packet_pairs[i-1]):
+            correct_pairs.append(i)    
+    return correct_pairs
+
+def get_decoder_key(packet_pairs:List[Tuple]) -> int:
+    all_packets = [[[2]], [[6]]]        # Start with the divider packets
+    for p in packet_pairs:
+        all_packets.append(p[0])
+        all_packets.append(p[1])
+    sorted_packets = sort_packets(all_packets)
+    for i in range(1, len(sorted_packets)+1):
+        if sorted_packets[i-1] == [[2]]:
+            idx1 = i
+        elif sorted_packets[i-1] == [[6]]:
+            idx2 = i    
+    return idx1*idx2
+
+def parse(lines:List[str]) -> List[Tuple]:
+    return parse_lines(list(lines))
+
+def part1(packet_pairs:List[Tuple]) -> int:
+    return sum(get_correct_pairs_indices(packet_pairs))
+
+def part2(packet_pairs:List[Tuple]) -> int:
+    return get_decoder_key(packet_pairs)
+
+
 if __name__ == '__main__':
-    load_dotenv()
-    lines = get_data(day=13, year=2022).splitlines()
-    packet_pairs = parse_lines(lines)
+    lines = iter_input_lines(day=13)
+    packet_pairs = parse(lines)
 
     # # Examples
     # print("Examples:")
@@ -79,22 +109,7 @@ if __name__ == '__main__':
     # print("----------")
 
     # Problem 1
-    correct_pairs = []
-    for i in range(1, len(packet_pairs)+1):
-        if compare(packet_pairs[i-1]):
-            correct_pairs.append(i)    
-    print(f"The sum of the indices of the correct pairs is {sum(correct_pairs)}")
+    print(f"The sum of the indices of the correct pairs is {part1(packet_pairs)}")
 
     # Problem 2
-    all_packets = [[[2]], [[6]]]        # Start with the divider packets
-    for p in packet_pairs:
-        all_packets.append(p[0])
-        all_packets.append(p[1])
-    sorted_packets = sort_packets(all_packets)
-    for i in range(1, len(sorted_packets)+1):
-        if sorted_packets[i-1] == [[2]]:
-            idx1 = i
-        elif sorted_packets[i-1] == [[6]]:
-            idx2 = i    
-    print(f"The indices of the sorted packets, mutliplied, are {idx1*idx2}")
-    
\ No newline at end of file
+    print(f"The indices of the sorted packets, mutliplied, are {part2(packet_pairs)}")
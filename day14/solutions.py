@@ -3,8 +3,8 @@ from enum import Enum
 from typing import List, Tuple
 
 import numpy as np
-from aocd import get_data
-from dotenv import load_dotenv
+from aoc.inputs import iter_input_lines
+from aoc.profiling import hot_path
 
 
 class Tile(Enum):
@@ -63,6 +63,7 @@ class Cave():
         self.grid[y, x] = Tile.SAND.value
         self.resting_sand_blocks += 1
 
+    @hot_path
     def produce_sand_block(self):
         y, x = self.start_pos
         while True:
@@ -98,15 +99,32 @@ class Cave():
         return grid_str
 
 
+def simulate(lines:List[str], with_floor:bool=False) -> Cave:
+    # Without floor, stop when sand falls into the void; with floor, when it obstructs the origin
+    c = Cave(lines, with_floor=with_floor, check_void=not with_floor, check_origin=with_floor)
+    while c.produce_sand_block(): pass
+    return c
+
+
+def parse(lines:List[str]) -> List[str]:
+    # The cave is different for the two problems, so it is built by each part
+    return list(lines)
+
+
+def part1(lines:List[str]) -> int:
+    return simulate(lines, with_floor=False).resting_sand_blocks
+
+
+def part2(lines:List[str]) -> int:
+    return simulate(lines, with_floor=True).resting_sand_blocks
+
+
 if __name__ == '__main__':
-    load_dotenv()
-    lines = get_data(year=2022, day=14).splitlines()
+    lines = parse(iter_input_lines(day=14))
     
     # Problem 1
-    print("Creating cave...")
-    c = Cave(lines, with_floor=False, check_void=True, check_origin=False)
-    print("Simulating sand blocks...")
-    while c.produce_sand_block(): pass
+    print("Creating cave and simulating sand blocks...")
+    c = simulate(lines, with_floor=False)
     print(f"{c.resting_sand_blocks} sand blocks have rested before the sand started "
           "dropping into the void.")
     print("Saving map on file map_1.txt...")
@@ -116,11 +134,8 @@ if __name__ == '__main__':
     print()
 
     # Problem 2
-    print("Creating cave...")
-    c = Cave(lines, with_floor=True, check_void=False, check_origin=True)
-    print("Simulating sand blocks...")
-    i = 0
-    while c.produce_sand_block(): pass
+    print("Creating cave and simulating sand blocks...")
+    c = simulate(lines, with_floor=True)
     print(f"{c.resting_sand_blocks} sand blocks have rested before the sand obstructed "
           "the origin.")
     print("Saving map on file map_2.txt...")
@@ -4,8 +4,7 @@ import concurrent.futures
 import numpy as np
 from typing import List, Set, Tuple
 
-from aocd import get_data
-from dotenv import load_dotenv
+from aoc.inputs import iter_input_lines
 
 class Cave():
     def __init__(self, lines:List[str]) -> None:
@@ -73,9 +72,21 @@ class Cave():
         return sensors, beacons
 
 
+def parse(lines:List[str]) -> Cave:
+    return Cave(lines)
+
+
+def part1(cave:Cave, line:int=2000000) -> int:
+    return len(cave.get_blocked_positions_in_line(line))
+
+
+def part2(cave:Cave) -> int:
+    x, y = cave.find_distress_beacon()
+    return x * 4000000 + y
+
+
 if __name__ == '__main__':
-    load_dotenv()
-    lines = get_data(year=2022, day=15).splitlines()
+    lines = iter_input_lines(day=15)
 
 #     lines = '''Sensor at x=2, y=18: closest beacon is at x=-2, y=15
 # Sensor at x=9, y=16: closest beacon is at x=10, y=16
@@ -92,12 +103,11 @@ if __name__ == '__main__':
 # Sensor at x=14, y=3: closest beacon is at x=15, y=3
 # Sensor at x=20, y=1: closest beacon is at x=15, y=3'''.splitlines()
 
-    cave = Cave(lines)
+    cave = parse(lines)
     
     # Problem 1
-    blocked_positions = cave.get_blocked_positions_in_line(2000000)
-    print(f"There are {len(blocked_positions)} blocked positions on row 2,000,000")
+    print(f"There are {part1(cave)} blocked positions on row 2,000,000")
 
     # Problem 2
     pos = cave.find_distress_beacon()
-    print(f"The distress beacon should be at {len(pos)}.")
+    print(f"The distress beacon should be at {pos}, its tuning frequency is {pos[0] * 4000000 + pos[1]}.")